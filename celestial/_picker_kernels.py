@@ -0,0 +1,122 @@
+#
+# This file is part of Celestial (https://github.com/OpenFogStack/celestial).
+# Copyright (c) 2024 Ben S. Kempton, Tobias Pfandzelter, The OpenFogStack Team.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""拾取计算内核：在屏幕坐标中查找距离点击位置最近的点"""
+
+import typing
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba不可用时使用numpy实现
+    numba = None
+
+
+def _nearest_sat_numpy(
+    coords: np.ndarray,
+    m: np.ndarray,
+    mask: np.ndarray,
+    cx: float,
+    cy: float,
+    ox: float,
+    oy: float,
+    w: float,
+    h: float,
+    thresh2: float,
+) -> typing.Tuple[int, float]:
+    """
+    nearest_sat的numpy实现，numba不可用时使用
+
+    :param coords: (N, 3)世界坐标
+    :param m: 4x4复合投影矩阵（世界坐标 -> 裁剪坐标）
+    :param mask: (N,)可参与拾取的点
+    :param cx: 点击位置x（显示坐标）
+    :param cy: 点击位置y（显示坐标）
+    :param ox: 渲染器原点x
+    :param oy: 渲染器原点y
+    :param w: 渲染器宽度
+    :param h: 渲染器高度
+    :param thresh2: 屏幕距离阈值的平方
+    :return: (索引, 距离平方)，未找到时索引为-1
+    """
+    clip = coords @ m[:, :3].T + m[:, 3]
+    pw = clip[:, 3]
+    valid = mask & (pw > 0)
+    if not valid.any():
+        return -1, thresh2
+
+    pw = np.where(valid, pw, 1.0)
+    dx = ox + (clip[:, 0] / pw + 1.0) * 0.5 * w - cx
+    dy = oy + (clip[:, 1] / pw + 1.0) * 0.5 * h - cy
+    d2 = np.where(valid, dx * dx + dy * dy, np.inf)
+
+    i = int(np.argmin(d2))
+    if d2[i] < thresh2:
+        return i, float(d2[i])
+    return -1, thresh2
+
+
+def _nearest_sat_loop(
+    coords: np.ndarray,
+    m: np.ndarray,
+    mask: np.ndarray,
+    cx: float,
+    cy: float,
+    ox: float,
+    oy: float,
+    w: float,
+    h: float,
+    thresh2: float,
+) -> typing.Tuple[int, float]:
+    """
+    nearest_sat的逐点实现，由numba编译，参数与_nearest_sat_numpy相同
+
+    投影、距离与最小值在一次遍历中完成，不产生中间数组
+    """
+    best = -1
+    best_d2 = thresh2
+    for i in range(coords.shape[0]):
+        if not mask[i]:
+            continue
+
+        x = coords[i, 0]
+        y = coords[i, 1]
+        z = coords[i, 2]
+
+        pw = m[3, 0] * x + m[3, 1] * y + m[3, 2] * z + m[3, 3]
+        # 位于相机后方
+        if pw <= 0.0:
+            continue
+
+        px = (m[0, 0] * x + m[0, 1] * y + m[0, 2] * z + m[0, 3]) / pw
+        py = (m[1, 0] * x + m[1, 1] * y + m[1, 2] * z + m[1, 3]) / pw
+
+        dx = ox + (px + 1.0) * 0.5 * w - cx
+        dy = oy + (py + 1.0) * 0.5 * h - cy
+        d2 = dx * dx + dy * dy
+
+        if d2 < best_d2:
+            best_d2 = d2
+            best = i
+
+    return best, best_d2
+
+
+if numba is not None:
+    nearest_sat = numba.njit(cache=True)(_nearest_sat_loop)
+else:
+    nearest_sat = _nearest_sat_numpy
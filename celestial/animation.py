@@ -105,13 +105,11 @@ class Animation:
         self.simulation_offset = 0    # 仿真时间偏移，将从消息中获取
         self.active_satellites = 0    # 活跃卫星数
         self.total_links_count = 0    # 总链路数
-        self.text_actors = []         # 存储文本演员对象
         self.progress_bar_actor = None  # 进度条演员对象
         self.progress_bg_actor = None   # 进度条背景演员对象
 
         # 点击交互相关属性
         self.info_panel_actor = None     # 信息面板演员对象
-        self.info_panel_text_actors = [] # 信息面板文本演员对象
         self.info_panel_close_btn = None # 信息面板关闭按钮
         self.selected_object = None      # 当前选中的对象（卫星或地面站）
         self.selected_shell = -1          # 当前选中的卫星所属的壳层
@@ -840,6 +838,255 @@ class Animation:
         self.renderWindow.Render()
         self.interactor.Start()
 
+    def _handleSRv6RouteMessage(self, received_data: typing.Dict[str, typing.Any]) -> None:
+        """
+        处理一条SRv6路由消息：计算路径节点的全局索引并加入消息队列等待显示
+
+        :param received_data: 路由服务器发送的srv6_route消息
+        """
+        try:
+            # print(f"接收到SRv6路由数据: {received_data}")
+
+            # 提取源节点和目标节点信息
+            source_info = received_data.get("source", {})
+            target_info = received_data.get("target", {})
+            segments = received_data.get("segments", [])
+
+            # 计算源节点和目标节点的全局索引
+            source_shell = source_info.get("shell", 0)
+            source_id = source_info.get("id", 0)
+            target_shell = target_info.get("shell", 0)
+            target_id = target_info.get("id", 0)
+
+            # 检查shell_sats是否已初始化
+            if not hasattr(self, 'shell_sats') or not self.shell_sats:
+                print("错误: shell_sats未初始化或为空，无法计算节点索引")
+                return
+
+            # 检查sat_positions是否已初始化
+            if not hasattr(self, 'sat_positions') or not self.sat_positions:
+                print("错误: sat_positions未初始化或为空，无法显示路径")
+                return
+
+            # 检查gst_positions是否已初始化
+            if not hasattr(self, 'gst_positions'):
+                print("警告: gst_positions未初始化，可能无法正确显示地面站路径")
+
+            # 计算源节点全局索引 - 使用与showRoutePath相同的逻辑
+            source_index = -1
+            if source_shell == 0 and hasattr(self, 'gst_positions') and source_id < len(self.gst_positions):  # 地面站
+                source_index = sum(self.shell_sats) + source_id
+            else:  # 卫星
+                # 注意：SRv6路由数据中shell可能从1开始，需要调整
+                shell_to_use = source_shell
+                if len(self.shell_sats) == 1 and source_shell == 1:  # 只有一个shell且shell=1的情况
+                    shell_to_use = 0
+
+                offset = 0
+                for s in range(shell_to_use):
+                    if s < len(self.shell_sats):
+                        offset += self.shell_sats[s]
+                source_index = offset + source_id
+
+            # 计算目标节点全局索引 - 使用与showRoutePath相同的逻辑
+            target_index = -1
+            if target_shell == 0 and hasattr(self, 'gst_positions') and target_id < len(self.gst_positions):  # 地面站
+                target_index = sum(self.shell_sats) + target_id
+            else:  # 卫星
+                # 注意：SRv6路由数据中shell可能从1开始，需要调整
+                shell_to_use = target_shell
+                if len(self.shell_sats) == 1 and target_shell == 1:  # 只有一个shell且shell=1的情况
+                    shell_to_use = 0
+
+                offset = 0
+                for s in range(shell_to_use):
+                    if s < len(self.shell_sats):
+                        offset += self.shell_sats[s]
+                target_index = offset + target_id
+
+            # 检查源节点和目标节点索引是否有效
+            if source_index < 0:
+                print(f"错误: 源节点索引 {source_index} 无效")
+                return
+
+            if target_index < 0:
+                print(f"错误: 目标节点索引 {target_index} 无效")
+                return
+
+            # 构建路径节点列表
+            path_nodes = [source_index]
+
+            # 添加中间节点
+            for i, segment in enumerate(segments):
+                try:
+                    seg_shell = segment.get("shell", 0)
+                    seg_id = segment.get("id", 0)
+
+                    # 检查shell和id是否为负值
+                    if seg_shell < 0 or seg_id < 0:
+                        print(f"警告: 中间节点{i+1}的shell={seg_shell}或id={seg_id}为负值，跳过此节点")
+                        continue
+
+                    # 计算中间节点全局索引 - 使用与showRoutePath相同的逻辑
+                    seg_index = -1
+                    try:
+                        # 检查shell和id是否为负值
+                        if seg_shell < 0 or seg_id < 0:
+                            print(f"错误: 中间节点{i+1}的shell={seg_shell}或id={seg_id}为负值，跳过此节点")
+                            continue
+
+                        # 注意：SRv6路由数据中shell可能从1开始，需要调整，与源节点和目标节点处理逻辑保持一致
+                        if len(self.shell_sats) == 1 and seg_shell == 1:  # 只有一个shell且shell=1的情况
+                            seg_shell = 0
+                        # 检查shell是否超出范围
+                        elif seg_shell >= len(self.shell_sats):
+                            print(f"错误: 中间节点{i+1}的shell={seg_shell}超出范围，shell数量={len(self.shell_sats)}")
+                            continue
+
+                        if seg_shell == 0 and hasattr(self, 'gst_positions') and seg_id < len(self.gst_positions):  # 地面站
+                            seg_index = sum(self.shell_sats) + seg_id
+                        else:  # 卫星
+                            # 使用可能已经调整过的shell值
+                            shell_to_use = seg_shell
+
+                            offset = 0
+                            for s in range(shell_to_use):
+                                if s < len(self.shell_sats):
+                                    offset += self.shell_sats[s]
+
+                            # 检查id是否超出卫星数量
+                            if shell_to_use < len(self.shell_sats) and seg_id >= self.shell_sats[shell_to_use]:
+                                print(f"错误: 中间节点{i+1}的id={seg_id}超出shell {shell_to_use}的卫星数量{self.shell_sats[shell_to_use]}")
+                                # 尝试使用有效范围内的ID
+                                if self.shell_sats[shell_to_use] > 0:
+                                    seg_id = seg_id % self.shell_sats[shell_to_use]
+                                    print(f"  尝试调整为有效ID: {seg_id}")
+                                else:
+                                    continue
+
+                            seg_index = offset + seg_id
+                    except Exception as e:
+                        print(f"处理中间节点{i+1}时出现异常: {e}")
+                        import traceback
+                        traceback.print_exc()
+                        continue
+
+                    if seg_index >= 0:  # 只添加有效的节点索引
+                        path_nodes.append(seg_index)
+                    else:
+                        print(f"警告: 中间节点{i+1}索引 {seg_index} 无效，跳过此节点")
+                except Exception as e:
+                    print(f"处理中间节点{i+1}时出错: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    continue
+
+            # 确保路径以目标节点结束
+            if path_nodes[-1] != target_index:
+                path_nodes.append(target_index)
+
+            # 检查路径节点是否有效
+            valid_path = True
+            for i, node_index in enumerate(path_nodes):
+                if node_index < 0:
+                    print(f"错误: 路径节点{i+1}的索引{node_index}小于0")
+                    valid_path = False
+                    continue
+
+                # 检查sat_positions和gst_positions是否已初始化
+                if not hasattr(self, 'sat_positions') or len(self.sat_positions) == 0:
+                    print(f"错误: sat_positions未初始化或为空")
+                    valid_path = False
+                    break
+
+                if not hasattr(self, 'gst_positions'):
+                    print(f"错误: gst_positions未初始化")
+                    valid_path = False
+                    break
+
+                # 计算卫星总数
+                total_sats = sum(self.shell_sats)
+
+                if node_index < total_sats:  # 卫星
+                    # 计算卫星所在的壳层和ID
+                    shell_no = 0
+                    sat_id = node_index
+                    accumulated = 0
+
+                    for s in range(self.num_shells):
+                        if sat_id < accumulated + self.shell_sats[s]:
+                            shell_no = s
+                            sat_id -= accumulated
+                            break
+                        accumulated += self.shell_sats[s]
+
+                    # 检查卫星位置是否存在
+                    if shell_no >= len(self.sat_positions):
+                        print(f"错误: 路径节点{i+1}的卫星壳层不存在: shell={shell_no}, 可用壳层数={len(self.sat_positions)}")
+                        valid_path = False
+                        continue
+
+                    if sat_id >= len(self.sat_positions[shell_no]):
+                        print(f"错误: 路径节点{i+1}的卫星ID超出范围: id={sat_id}, 壳层{shell_no}的卫星数量={len(self.sat_positions[shell_no])}")
+                        valid_path = False
+                        continue
+                else:  # 地面站
+                    gst_id = node_index - total_sats
+
+                    if gst_id >= len(self.gst_positions):
+                        print(f"错误: 路径节点{i+1}的地面站位置不存在: id={gst_id}, 地面站总数={len(self.gst_positions)}")
+                        valid_path = False
+                        continue
+
+
+            # 清除之前的SRv6路由路径和箭头
+            try:
+                print("准备清除之前的SRv6路由路径和箭头")
+                self.clearSRv6RoutePath()
+                print("已清除之前的SRv6路由路径和箭头")
+            except Exception as e:
+                print(f"清除之前的SRv6路由路径和箭头时出错: {e}")
+                import traceback
+                traceback.print_exc()
+
+            # 检查路径节点是否有效
+            display_path = True
+            if len(path_nodes) < 2:
+                print(f"SRv6路径节点数量不足: {len(path_nodes)}")
+                display_path = False
+
+            if not valid_path:
+                print("SRv6路径包含无效节点，取消显示")
+                display_path = False
+
+            # 检查路径中是否有无效的节点索引
+            total_nodes = sum(self.shell_sats) + (len(self.gst_positions) if hasattr(self, 'gst_positions') else 0)
+            for node_idx in path_nodes:
+                if node_idx < 0 or node_idx >= total_nodes:
+                    print(f"SRv6路径包含无效的节点索引: {node_idx}, 总节点数: {total_nodes}")
+                    display_path = False
+                    break
+
+            # 显示SRv6路由路径（使用蓝色）
+            if display_path:
+                try:
+                    # 将路由路径消息添加到队列，而不是直接调用displaySRv6RoutePath
+                    with self.message_queue_lock:
+                        self.message_queue.append({
+                            "type": "srv6_route",
+                            "path_nodes": path_nodes
+                        })
+                except Exception as e:
+                    print(f"将SRv6路由路径添加到消息队列时出错: {e}")
+                    import traceback
+                    traceback.print_exc()
+            else:
+                print(f"SRv6路径无法显示: 节点数={len(path_nodes)}, 路径有效={valid_path}, 显示决定={display_path}")
+        except Exception as e:
+            import traceback
+            print(f"处理SRv6路由数据时出错: {e}")
+            traceback.print_exc()
+
     def controlThreadHandler(self) -> None:
         """
         这个函数处理与星座的所有通信
@@ -889,250 +1136,12 @@ class Animation:
                                         
                 # 处理SRv6路由数据
                 if command == "srv6_route":
-                    try:
-                        # print(f"接收到SRv6路由数据: {received_data}")
-                        
-                        # 提取源节点和目标节点信息
-                        source_info = received_data.get("source", {})
-                        target_info = received_data.get("target", {})
-                        segments = received_data.get("segments", [])
-                        
-                        # 计算源节点和目标节点的全局索引
-                        source_shell = source_info.get("shell", 0)
-                        source_id = source_info.get("id", 0)
-                        target_shell = target_info.get("shell", 0)
-                        target_id = target_info.get("id", 0)
-                        
-                        # 检查shell_sats是否已初始化
-                        if not hasattr(self, 'shell_sats') or not self.shell_sats:
-                            print("错误: shell_sats未初始化或为空，无法计算节点索引")
-                            return
-                            
-                        # 检查sat_positions是否已初始化
-                        if not hasattr(self, 'sat_positions') or not self.sat_positions:
-                            print("错误: sat_positions未初始化或为空，无法显示路径")
-                            return
-                            
-                        # 检查gst_positions是否已初始化
-                        if not hasattr(self, 'gst_positions'):
-                            print("警告: gst_positions未初始化，可能无法正确显示地面站路径")
-                        
-                        # 计算源节点全局索引 - 使用与showRoutePath相同的逻辑
-                        source_index = -1
-                        if source_shell == 0 and hasattr(self, 'gst_positions') and source_id < len(self.gst_positions):  # 地面站
-                            source_index = sum(self.shell_sats) + source_id
-                        else:  # 卫星
-                            # 注意：SRv6路由数据中shell可能从1开始，需要调整
-                            shell_to_use = source_shell
-                            if len(self.shell_sats) == 1 and source_shell == 1:  # 只有一个shell且shell=1的情况
-                                shell_to_use = 0
-                            
-                            offset = 0
-                            for s in range(shell_to_use):
-                                if s < len(self.shell_sats):
-                                    offset += self.shell_sats[s]
-                            source_index = offset + source_id
-                        
-                        # 计算目标节点全局索引 - 使用与showRoutePath相同的逻辑
-                        target_index = -1
-                        if target_shell == 0 and hasattr(self, 'gst_positions') and target_id < len(self.gst_positions):  # 地面站
-                            target_index = sum(self.shell_sats) + target_id
-                        else:  # 卫星
-                            # 注意：SRv6路由数据中shell可能从1开始，需要调整
-                            shell_to_use = target_shell
-                            if len(self.shell_sats) == 1 and target_shell == 1:  # 只有一个shell且shell=1的情况
-                                shell_to_use = 0
-                            
-                            offset = 0
-                            for s in range(shell_to_use):
-                                if s < len(self.shell_sats):
-                                    offset += self.shell_sats[s]
-                            target_index = offset + target_id
-                        
-                        # 检查源节点和目标节点索引是否有效
-                        if source_index < 0:
-                            print(f"错误: 源节点索引 {source_index} 无效")
-                            return
-                            
-                        if target_index < 0:
-                            print(f"错误: 目标节点索引 {target_index} 无效")
-                            return
-                        
-                        # 构建路径节点列表
-                        path_nodes = [source_index]
-                        
-                        # 添加中间节点
-                        for i, segment in enumerate(segments):
-                            try:
-                                seg_shell = segment.get("shell", 0)
-                                seg_id = segment.get("id", 0)
-                                
-                                # 检查shell和id是否为负值
-                                if seg_shell < 0 or seg_id < 0:
-                                    print(f"警告: 中间节点{i+1}的shell={seg_shell}或id={seg_id}为负值，跳过此节点")
-                                    continue
-                                                                    
-                                # 计算中间节点全局索引 - 使用与showRoutePath相同的逻辑
-                                seg_index = -1
-                                try:
-                                    # 检查shell和id是否为负值
-                                    if seg_shell < 0 or seg_id < 0:
-                                        print(f"错误: 中间节点{i+1}的shell={seg_shell}或id={seg_id}为负值，跳过此节点")
-                                        continue
-                                        
-                                    # 注意：SRv6路由数据中shell可能从1开始，需要调整，与源节点和目标节点处理逻辑保持一致
-                                    if len(self.shell_sats) == 1 and seg_shell == 1:  # 只有一个shell且shell=1的情况
-                                        seg_shell = 0
-                                    # 检查shell是否超出范围
-                                    elif seg_shell >= len(self.shell_sats):
-                                        print(f"错误: 中间节点{i+1}的shell={seg_shell}超出范围，shell数量={len(self.shell_sats)}")
-                                        continue
-                                    
-                                    if seg_shell == 0 and hasattr(self, 'gst_positions') and seg_id < len(self.gst_positions):  # 地面站
-                                        seg_index = sum(self.shell_sats) + seg_id
-                                    else:  # 卫星
-                                        # 使用可能已经调整过的shell值
-                                        shell_to_use = seg_shell
-                                        
-                                        offset = 0
-                                        for s in range(shell_to_use):
-                                            if s < len(self.shell_sats):
-                                                offset += self.shell_sats[s]
-                                        
-                                        # 检查id是否超出卫星数量
-                                        if shell_to_use < len(self.shell_sats) and seg_id >= self.shell_sats[shell_to_use]:
-                                            print(f"错误: 中间节点{i+1}的id={seg_id}超出shell {shell_to_use}的卫星数量{self.shell_sats[shell_to_use]}")
-                                            # 尝试使用有效范围内的ID
-                                            if self.shell_sats[shell_to_use] > 0:
-                                                seg_id = seg_id % self.shell_sats[shell_to_use]
-                                                print(f"  尝试调整为有效ID: {seg_id}")
-                                            else:
-                                                continue
-                                            
-                                        seg_index = offset + seg_id
-                                except Exception as e:
-                                    print(f"处理中间节点{i+1}时出现异常: {e}")
-                                    import traceback
-                                    traceback.print_exc()
-                                    continue
-                                
-                                if seg_index >= 0:  # 只添加有效的节点索引
-                                    path_nodes.append(seg_index)
-                                else:
-                                    print(f"警告: 中间节点{i+1}索引 {seg_index} 无效，跳过此节点")
-                            except Exception as e:
-                                print(f"处理中间节点{i+1}时出错: {e}")
-                                import traceback
-                                traceback.print_exc()
-                                continue
-                        
-                        # 确保路径以目标节点结束
-                        if path_nodes[-1] != target_index:
-                            path_nodes.append(target_index)
-                        
-                        # 检查路径节点是否有效
-                        valid_path = True
-                        for i, node_index in enumerate(path_nodes):
-                            if node_index < 0:
-                                print(f"错误: 路径节点{i+1}的索引{node_index}小于0")
-                                valid_path = False
-                                continue
-                                
-                            # 检查sat_positions和gst_positions是否已初始化
-                            if not hasattr(self, 'sat_positions') or len(self.sat_positions) == 0:
-                                print(f"错误: sat_positions未初始化或为空")
-                                valid_path = False
-                                break
-                                
-                            if not hasattr(self, 'gst_positions'):
-                                print(f"错误: gst_positions未初始化")
-                                valid_path = False
-                                break
-                                
-                            # 计算卫星总数
-                            total_sats = sum(self.shell_sats)
-                                
-                            if node_index < total_sats:  # 卫星
-                                # 计算卫星所在的壳层和ID
-                                shell_no = 0
-                                sat_id = node_index
-                                accumulated = 0
-                                
-                                for s in range(self.num_shells):
-                                    if sat_id < accumulated + self.shell_sats[s]:
-                                        shell_no = s
-                                        sat_id -= accumulated
-                                        break
-                                    accumulated += self.shell_sats[s]
-                                                                
-                                # 检查卫星位置是否存在
-                                if shell_no >= len(self.sat_positions):
-                                    print(f"错误: 路径节点{i+1}的卫星壳层不存在: shell={shell_no}, 可用壳层数={len(self.sat_positions)}")
-                                    valid_path = False
-                                    continue
-                                    
-                                if sat_id >= len(self.sat_positions[shell_no]):
-                                    print(f"错误: 路径节点{i+1}的卫星ID超出范围: id={sat_id}, 壳层{shell_no}的卫星数量={len(self.sat_positions[shell_no])}")
-                                    valid_path = False
-                                    continue
-                            else:  # 地面站
-                                gst_id = node_index - total_sats
-                                
-                                if gst_id >= len(self.gst_positions):
-                                    print(f"错误: 路径节点{i+1}的地面站位置不存在: id={gst_id}, 地面站总数={len(self.gst_positions)}")
-                                    valid_path = False
-                                    continue
-                        
-                        
-                        # 清除之前的SRv6路由路径和箭头
-                        try:
-                            print("准备清除之前的SRv6路由路径和箭头")
-                            self.clearSRv6RoutePath()
-                            print("已清除之前的SRv6路由路径和箭头")
-                        except Exception as e:
-                            print(f"清除之前的SRv6路由路径和箭头时出错: {e}")
-                            import traceback
-                            traceback.print_exc()
-                        
-                        # 检查路径节点是否有效
-                        display_path = True
-                        if len(path_nodes) < 2:
-                            print(f"SRv6路径节点数量不足: {len(path_nodes)}")
-                            display_path = False
-                        
-                        if not valid_path:
-                            print("SRv6路径包含无效节点，取消显示")
-                            display_path = False
-                            
-                        # 检查路径中是否有无效的节点索引
-                        total_nodes = sum(self.shell_sats) + (len(self.gst_positions) if hasattr(self, 'gst_positions') else 0)
-                        for node_idx in path_nodes:
-                            if node_idx < 0 or node_idx >= total_nodes:
-                                print(f"SRv6路径包含无效的节点索引: {node_idx}, 总节点数: {total_nodes}")
-                                display_path = False
-                                break
-                        
-                        # 显示SRv6路由路径（使用蓝色）
-                        if display_path:
-                            try:
-                                # 将路由路径消息添加到队列，而不是直接调用displaySRv6RoutePath
-                                with self.message_queue_lock:
-                                    self.message_queue.append({
-                                        "type": "srv6_route",
-                                        "path_nodes": path_nodes
-                                    })
-                            except Exception as e:
-                                print(f"将SRv6路由路径添加到消息队列时出错: {e}")
-                                import traceback
-                                traceback.print_exc()
-                        else:
-                            print(f"SRv6路径无法显示: 节点数={len(path_nodes)}, 路径有效={valid_path}, 显示决定={display_path}")
-                    except Exception as e:
-                        import traceback
-                        print(f"处理SRv6路由数据时出错: {e}")
-                        traceback.print_exc()
-                    # 处理完SRv6路由消息后继续处理其他消息类型
-                    # 移除continue语句，允许处理其他类型的消息
+                    self._handleSRv6RouteMessage(received_data)
+
+                # 处理路由服务器合并发送的一批SRv6路由数据
+                elif command == "srv6_batch":
+                    for route_msg in received_data.get("messages", []):
+                        self._handleSRv6RouteMessage(route_msg)
                 
                 if command == "time":
                     # 更新模拟时间
@@ -85,6 +85,10 @@ INFO_PANEL_LINE_HEIGHT = 20  # 行高
 INFO_PANEL_CLOSE_BTN_SIZE = 20  # 关闭按钮大小
 INFO_PANEL_CLOSE_BTN_COLOR = (0.7, 0.0, 0.0)  # 关闭按钮颜色（红色）
 
+# 点击拾取相关常量（拾取时比较距离的平方，避免开方）
+PICK_SAT_DISTANCE2 = 20 ** 2  # 卫星拾取屏幕距离阈值的平方（20像素）
+PICK_GST_DISTANCE2 = 15 ** 2  # 地面站拾取屏幕距离阈值的平方（15像素）
+
 # 路由路径显示相关常量
 ROUTE_PATH_COLOR = (1.0, 0.0, 0.0)  # 红色路径
 ROUTE_PATH_OPACITY = 1.0  # 路径透明度
@@ -19,16 +19,27 @@
 
 import vtk
 import typing
+import functools
+import numpy as np
+from vtk.util import numpy_support
 import os
+import shutil
 import subprocess
 import time
 
 from celestial.animation_constants import *
+from celestial._picker_kernels import nearest_sat
 
 class AnimationUI:
     """
     Animation UI related functionality
     """
+
+    # 信息面板布局（相对于面板左上角向下的偏移），面板固定显示6行文本
+    _PANEL_LINES = 6
+    _PANEL_TEXT_DY = INFO_PANEL_PADDING + _PANEL_LINES * INFO_PANEL_LINE_HEIGHT  # 文本底部
+    _PANEL_SSH_BTN_DY = _PANEL_LINES * INFO_PANEL_LINE_HEIGHT + 2 * INFO_PANEL_PADDING  # SSH按钮顶部
+    _PANEL_HEIGHT = _PANEL_LINES * INFO_PANEL_LINE_HEIGHT + INFO_PANEL_SSH_BTN_HEIGHT + 3 * INFO_PANEL_PADDING
     
     def __init__(self, animation):
         """
@@ -42,16 +53,38 @@ class AnimationUI:
         self.renderWindow = animation.renderWindow
         
         # 全局信息显示相关属性
-        self.text_actors = []         # 存储文本演员对象
+        self._info_text = None          # 全局信息文本演员对象（多行）
+        # 全局信息文本模板（自上而下排列，空行为进度条预留位置）
+        self._info_template = (
+            "Total Links: {links}\n"
+            "Ground Stations: {gs}\n"
+            "Active Satellites: {sat}\n"
+            "\n"
+            "Progress: {p}\n"
+            "Simulation Time: {t:.2f} s"
+        )
+        self._last_ui_state = None      # 上次更新信息文本时的仿真状态
         self.progress_bar_actor = None  # 进度条演员对象
         self.progress_bg_actor = None   # 进度条背景演员对象
         
         # 点击信息面板相关属性
         self.info_panel_actor = None     # 信息面板演员对象
-        self.info_panel_text_actors = [] # 信息面板文本演员对象
+        self.info_panel_text = None      # 信息面板文本演员对象（多行）
         self.info_panel_close_btn = None # 信息面板关闭按钮
         self.info_panel_ssh_btn = None   # SSH按钮
         self.ssh_btn_text = None         # SSH按钮文本
+        self._panel_points = None        # 信息面板背景顶点
+        self._panel_height = None        # 信息面板当前高度
+        self._panel_layout_pos = None    # 信息面板上次布局的位置
+        self._panel_origin = (0, 0)      # 信息面板左上角位置，随窗口大小更新
+        self._panel_assembly = None      # 信息面板所有元素的组合
+        self._close_btn_bbox = None      # 关闭按钮包围盒 (xmin, ymin, xmax, ymax)
+        self._ssh_btn_bbox = None        # SSH按钮包围盒 (xmin, ymin, xmax, ymax)
+        self._panel_assembly_added = False  # 组合是否已添加到渲染器
+
+        # 拾取相关缓存：壳层索引 -> (点集MTime, 世界坐标数组)
+        self._cached_coords: typing.Dict[int, typing.Tuple[int, np.ndarray]] = {}
+        self._gst_world: typing.Optional[typing.Tuple[int, np.ndarray]] = None  # (点集MTime, 地面站世界坐标)
         
         # 创建UI组件
         self.makeInfoTextActors()
@@ -59,6 +92,22 @@ class AnimationUI:
         self.makeInfoPanel()
         self.setupPicker()
 
+        # 窗口大小改变时更新信息面板位置
+        self._onWindowModified(self.renderWindow, "ModifiedEvent")
+        self.renderWindow.AddObserver("ModifiedEvent", self._onWindowModified)
+
+        # 根据卫星数据的实际类型预先确定可见性检查方式
+        self._is_visible = self._makeVisibilityCheck()
+        # 活跃卫星计数沿用原有口径：结构化数组中的卫星不按in_bbox过滤
+        self._is_counted = self._makeVisibilityCheck(structured_in_bbox=False)
+        # SSH终端参数构建函数和SSH命令前缀，只在启动时检测一次
+        self._terminal_argv = self._findTerminal()
+        ssh_key_path = os.path.expanduser(SSH_KEY_PATH)  # 展开波浪号为用户主目录
+        self._ssh_command_prefix = f"ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null -i {ssh_key_path} root@"
+
+        # 卫星信息提取函数，首次调用时根据数据类型选定
+        self._extract_sat = self._selectSatExtractor
+
     def updateInfoText(self, active_satellites=None, total_links=None) -> None:
         """
         更新信息文本显示
@@ -66,7 +115,7 @@ class AnimationUI:
         :param active_satellites: 活跃卫星数（如果提供）
         :param total_links: 总链路数（如果提供）
         """
-        if not self.text_actors:
+        if self._info_text is None:
             return
 
         # 使用传入的参数或重新计算
@@ -75,23 +124,7 @@ class AnimationUI:
             active_satellites = 0
             for s in range(self.animation.num_shells):
                 for i in range(self.animation.shell_sats[s]):
-                    # 处理numpy.void类型和字典类型
-                    try:
-                        # 如果是字典类型
-                        if hasattr(self.animation.sat_positions[s][i], 'get'):
-                            if self.animation.sat_positions[s][i].get("in_bbox", True):
-                                active_satellites += 1
-                        # 如果是numpy.void类型
-                        elif hasattr(self.animation.sat_positions[s][i], 'item'):
-                            if 'in_bbox' in self.animation.sat_positions[s].dtype.names and self.animation.sat_positions[s][i]['in_bbox']:
-                                active_satellites += 1
-                            else:
-                                active_satellites += 1  # 如果没有in_bbox字段，默认计数
-                        else:
-                            active_satellites += 1  # 其他情况，默认计数
-                    except Exception as e:
-                        print(f"计算活跃卫星数时出错: {e}")
-                        # 出错时默认计数该卫星
+                    if self._is_counted(s, i):
                         active_satellites += 1
         self.animation.active_satellites = active_satellites
         
@@ -104,8 +137,21 @@ class AnimationUI:
                 total_links += len(self.animation.gst_links[s])
         self.animation.total_links_count = total_links
 
-        # 更新文本显示
-        self.text_actors[0].SetInput(f"Simulation Time: {self.animation.current_simulation_time:.2f} s")
+        # 显示的内容与上次相同（如暂停或仅移动相机）时跳过更新
+        state = (
+            self.animation.current_simulation_time,
+            self.animation.simulation_duration,
+            self.animation.simulation_offset,
+            self.animation.active_satellites,
+            self.animation.total_links_count,
+            self.animation.gst_num,
+            self.animation.selected_object,
+            self.animation.selected_id,
+            self.animation.selected_shell,
+        )
+        if state == self._last_ui_state:
+            return
+        self._last_ui_state = state
 
         # 计算和显示进度
         if self.animation.simulation_duration > 0:
@@ -114,17 +160,20 @@ class AnimationUI:
             progress = max(0.0, min(1.0, progress))  # 确保进度在0-1范围内
             progress_percent = progress * 100
 
-            # 更新进度文本
-            self.text_actors[1].SetInput(f"Progress: {progress_percent:.1f}%")
-
             # 更新进度条
             self.updateProgressBar(progress)
+            progress_str = f"{progress_percent:.1f}%"
         else:
-            self.text_actors[1].SetInput("Progress: Unknown")
+            progress_str = "Unknown"
 
-        self.text_actors[3].SetInput(f"Active Satellites: {self.animation.active_satellites}")
-        self.text_actors[4].SetInput(f"Ground Stations: {self.animation.gst_num}")
-        self.text_actors[5].SetInput(f"Total Links: {self.animation.total_links_count}")
+        # 更新文本显示
+        self._info_text.SetInput(self._info_template.format(
+            links=self.animation.total_links_count,
+            gs=self.animation.gst_num,
+            sat=self.animation.active_satellites,
+            p=progress_str,
+            t=self.animation.current_simulation_time,
+        ))
 
         # 如果有选中的对象，更新信息面板
         if self.animation.selected_object == "satellite" and self.animation.selected_shell >= 0 and self.animation.selected_id >= 0:
@@ -133,21 +182,24 @@ class AnimationUI:
             self.updateGroundStationInfoPanel(self.animation.selected_id)
 
     def makeInfoTextActors(self) -> None:
-        """Create text actors for displaying global information"""
-        # Clear existing text actors
-        for actor in self.text_actors:
-            self.renderer.RemoveActor(actor)
-        self.text_actors = []
-
-        # Create text actors
-        for i in range(6):  # Pre-create 6 lines of text (removed average delay)
-            text_actor = vtk.vtkTextActor()
-            text_actor.GetTextProperty().SetFontSize(TEXT_SIZE)
-            text_actor.GetTextProperty().SetColor(TEXT_COLOR)
-            text_actor.GetTextProperty().SetOpacity(TEXT_OPACITY)
-            text_actor.SetPosition(TEXT_POSITION_X, TEXT_POSITION_Y + i * TEXT_LINE_SPACING)
-            self.text_actors.append(text_actor)
-            self.renderer.AddActor(text_actor)
+        """Create the text actor for displaying global information"""
+        # Clear existing text actor
+        if self._info_text is not None:
+            self.renderer.RemoveActor(self._info_text)
+
+        # A single multi-line text actor; lines are laid out bottom-up from
+        # TEXT_POSITION_Y with TEXT_LINE_SPACING pixels per line
+        self._info_text = vtk.vtkTextActor()
+        self._info_text.GetTextProperty().SetFontSize(TEXT_SIZE)
+        self._info_text.GetTextProperty().SetColor(TEXT_COLOR)
+        self._info_text.GetTextProperty().SetOpacity(TEXT_OPACITY)
+        self._info_text.GetTextProperty().SetLineSpacing(TEXT_LINE_SPACING / TEXT_SIZE)
+        self._info_text.GetTextProperty().SetVerticalJustificationToBottom()
+        self._info_text.SetPosition(TEXT_POSITION_X, TEXT_POSITION_Y)
+        self.renderer.AddActor(self._info_text)
+
+        # The new actor is empty, so the next update must not be skipped
+        self._last_ui_state = None
 
     def makeProgressBar(self) -> None:
         """
@@ -255,8 +307,8 @@ class AnimationUI:
         panel_points = vtk.vtkPoints()
         panel_points.InsertNextPoint(0, 0, 0)  # 左上
         panel_points.InsertNextPoint(INFO_PANEL_WIDTH, 0, 0)  # 右上
-        panel_points.InsertNextPoint(INFO_PANEL_WIDTH, -200, 0)  # 右下（高度动态调整）
-        panel_points.InsertNextPoint(0, -200, 0)  # 左下
+        panel_points.InsertNextPoint(INFO_PANEL_WIDTH, -self._PANEL_HEIGHT, 0)  # 右下（可通过resizeInfoPanel调整）
+        panel_points.InsertNextPoint(0, -self._PANEL_HEIGHT, 0)  # 左下
 
         panel_cells = vtk.vtkCellArray()
         panel_cells.InsertNextCell(4)
@@ -272,13 +324,15 @@ class AnimationUI:
         panel_mapper = vtk.vtkPolyDataMapper2D()
         panel_mapper.SetInputData(panel_poly_data)
 
+        # 保留面板点集，调整高度时原地修改而不是重建几何
+        self._panel_points = panel_points
+        self._panel_height = self._PANEL_HEIGHT
+
         self.info_panel_actor = vtk.vtkActor2D()
         self.info_panel_actor.SetMapper(panel_mapper)
         self.info_panel_actor.GetProperty().SetColor(INFO_PANEL_BG_COLOR)
         self.info_panel_actor.GetProperty().SetOpacity(INFO_PANEL_OPACITY)
         self.info_panel_actor.SetPosition(100, 400)  # 初始位置
-        self.info_panel_actor.VisibilityOff()  # 初始隐藏
-        self.renderer.AddActor(self.info_panel_actor)
 
         # 创建关闭按钮
         close_btn_points = vtk.vtkPoints()
@@ -306,8 +360,6 @@ class AnimationUI:
         self.info_panel_close_btn.GetProperty().SetColor(INFO_PANEL_CLOSE_BTN_COLOR)
         self.info_panel_close_btn.GetProperty().SetOpacity(1.0)
         self.info_panel_close_btn.SetPosition(100 + INFO_PANEL_WIDTH - INFO_PANEL_CLOSE_BTN_SIZE - INFO_PANEL_PADDING, 400)  # 右上角
-        self.info_panel_close_btn.VisibilityOff()  # 初始隐藏
-        self.renderer.AddActor(self.info_panel_close_btn)
 
         # 创建SSH按钮
         ssh_btn_points = vtk.vtkPoints()
@@ -335,8 +387,6 @@ class AnimationUI:
         self.info_panel_ssh_btn.GetProperty().SetColor(INFO_PANEL_SSH_BTN_COLOR)
         self.info_panel_ssh_btn.GetProperty().SetOpacity(1.0)
         self.info_panel_ssh_btn.SetPosition(100 + INFO_PANEL_PADDING, 400 - 150)  # 初始位置，将在更新面板时调整
-        self.info_panel_ssh_btn.VisibilityOff()  # 初始隐藏
-        self.renderer.AddActor(self.info_panel_ssh_btn)
 
         # 创建SSH按钮文本
         self.ssh_btn_text = vtk.vtkTextActor()
@@ -346,19 +396,26 @@ class AnimationUI:
         self.ssh_btn_text.GetTextProperty().SetJustificationToCentered()
         self.ssh_btn_text.GetTextProperty().SetVerticalJustificationToCentered()
         self.ssh_btn_text.SetPosition(100 + INFO_PANEL_PADDING + INFO_PANEL_SSH_BTN_WIDTH/2, 400 - 150 - INFO_PANEL_SSH_BTN_HEIGHT/2)
-        self.ssh_btn_text.VisibilityOff()  # 初始隐藏
-        self.renderer.AddActor(self.ssh_btn_text)
-
-        # 创建面板文本
-        for i in range(10):  # 预创建10行文本
-            text_actor = vtk.vtkTextActor()
-            text_actor.GetTextProperty().SetFontSize(INFO_PANEL_TEXT_SIZE)
-            text_actor.GetTextProperty().SetColor(INFO_PANEL_TEXT_COLOR)
-            text_actor.GetTextProperty().SetOpacity(TEXT_OPACITY)
-            text_actor.SetPosition(100 + INFO_PANEL_PADDING, 400 - INFO_PANEL_PADDING - i * INFO_PANEL_LINE_HEIGHT)
-            text_actor.VisibilityOff()  # 初始隐藏
-            self.info_panel_text_actors.append(text_actor)
-            self.renderer.AddActor(text_actor)
+
+        # 创建面板文本（单个多行文本演员）
+        self.info_panel_text = vtk.vtkTextActor()
+        self.info_panel_text.GetTextProperty().SetFontSize(INFO_PANEL_TEXT_SIZE)
+        self.info_panel_text.GetTextProperty().SetColor(INFO_PANEL_TEXT_COLOR)
+        self.info_panel_text.GetTextProperty().SetOpacity(TEXT_OPACITY)
+        self.info_panel_text.GetTextProperty().SetLineSpacing(INFO_PANEL_LINE_HEIGHT / INFO_PANEL_TEXT_SIZE)
+        self.info_panel_text.GetTextProperty().SetVerticalJustificationToBottom()
+        self.info_panel_text.SetPosition(100 + INFO_PANEL_PADDING, 400 - INFO_PANEL_PADDING)
+
+        # 将面板的所有2D元素组合为一个prop，显示/隐藏只需切换一次可见性；
+        # 首次显示面板时才添加到渲染器，未显示面板时渲染器无需遍历这些元素
+        self._panel_assembly = vtk.vtkPropAssembly()
+        self._panel_assembly.AddPart(self.info_panel_actor)
+        self._panel_assembly.AddPart(self.info_panel_close_btn)
+        self._panel_assembly.AddPart(self.info_panel_ssh_btn)
+        self._panel_assembly.AddPart(self.ssh_btn_text)
+        self._panel_assembly.AddPart(self.info_panel_text)
+        self._panel_assembly.VisibilityOff()  # 初始隐藏
+        self._panel_assembly_added = False
 
     def setupPicker(self) -> None:
         """设置点击拾取器"""
@@ -395,92 +452,23 @@ class AnimationUI:
         # 获取点击位置
         clickPos = self.interactor.GetEventPosition()
         
-        # 检查是否点击了关闭按钮
-        if self.info_panel_actor and self.info_panel_actor.GetVisibility():
-            close_btn_pos = self.info_panel_close_btn.GetPosition()
-            if (clickPos[0] >= close_btn_pos[0] and 
-                clickPos[0] <= close_btn_pos[0] + INFO_PANEL_CLOSE_BTN_SIZE and
-                clickPos[1] >= close_btn_pos[1] - INFO_PANEL_CLOSE_BTN_SIZE and
-                clickPos[1] <= close_btn_pos[1]):
+        # 检查是否点击了关闭按钮（包围盒在面板布局时缓存）
+        if self.info_panel_actor and self._panel_assembly.GetVisibility() and self._close_btn_bbox is not None:
+            cx, cy = clickPos
+            bbox = self._close_btn_bbox
+            if bbox[0] <= cx <= bbox[2] and bbox[1] <= cy <= bbox[3]:
                 self.hideInfoPanel()
                 return
                 
             # 检查是否点击了SSH按钮
-            if self.info_panel_ssh_btn and self.info_panel_ssh_btn.GetVisibility():
-                ssh_btn_pos = self.info_panel_ssh_btn.GetPosition()
-                if (clickPos[0] >= ssh_btn_pos[0] and 
-                    clickPos[0] <= ssh_btn_pos[0] + INFO_PANEL_SSH_BTN_WIDTH and
-                    clickPos[1] >= ssh_btn_pos[1] - INFO_PANEL_SSH_BTN_HEIGHT and
-                    clickPos[1] <= ssh_btn_pos[1]):
-                    self.executeSSHCommand()
-                    return
-        
-        # 使用拾取器检测点击的对象
-        picker = self.interactor.GetPicker()
+            bbox = self._ssh_btn_bbox
+            if bbox[0] <= cx <= bbox[2] and bbox[1] <= cy <= bbox[3]:
+                self.executeSSHCommand()
+                return
         
         # 首先尝试检测卫星点云（设置最高优先级）
         # 这是因为vtkPropPicker可能无法很好地拾取点云，所以我们使用屏幕坐标计算
-        clickPos = self.interactor.GetEventPosition()
-        closest_sat_shell = -1
-        closest_sat_id = -1
-        min_screen_distance = 20  # 屏幕像素距离阈值
-        
-        # 遍历所有shell中的卫星
-        for s in range(self.animation.num_shells):
-            if s >= len(self.animation.actors.shell_actors):
-                continue
-                
-            # 获取点云数据
-            points = None
-            if hasattr(self.animation.actors.shell_actors[s], 'satVtkPts'):
-                points = self.animation.actors.shell_actors[s].satVtkPts
-            elif hasattr(self.animation.actors.shell_inactive_actors[s], 'satVtkPts'):
-                points = self.animation.actors.shell_inactive_actors[s].satVtkPts
-                
-            if not points:
-                continue
-                
-            # 检查每个卫星点
-            for i in range(min(self.animation.shell_sats[s], points.GetNumberOfPoints())):
-                # 只检查在视图范围内的卫星
-                # 处理numpy.void类型和字典类型
-                try:
-                    # 如果是字典类型
-                    if hasattr(self.animation.sat_positions[s][i], 'get'):
-                        if not self.animation.sat_positions[s][i].get("in_bbox", True):
-                            continue
-                    # 如果是numpy.void类型
-                    elif hasattr(self.animation.sat_positions[s][i], 'item'):
-                        if 'in_bbox' in self.animation.sat_positions[s].dtype.names and not self.animation.sat_positions[s][i]['in_bbox']:
-                            continue
-                    # 其他情况，默认显示
-                except Exception as e:
-                    print(f"检查卫星可见性时出错: {e}")
-                    # 出错时默认显示该卫星
-                    pass
-                    
-                # 获取卫星世界坐标
-                sat_world_pos = [0, 0, 0]
-                points.GetPoint(i, sat_world_pos)
-                
-                # 转换为屏幕坐标
-                coordinate = vtk.vtkCoordinate()
-                coordinate.SetCoordinateSystemToWorld()
-                coordinate.SetValue(sat_world_pos[0], sat_world_pos[1], sat_world_pos[2])
-                sat_screen_pos = coordinate.GetComputedDisplayValue(self.renderer)
-                
-                if not sat_screen_pos:
-                    continue
-                    
-                # 计算屏幕距离
-                screen_dist = ((clickPos[0] - sat_screen_pos[0])**2 + 
-                              (clickPos[1] - sat_screen_pos[1])**2)**0.5
-                
-                # 如果距离小于阈值且小于当前最小距离
-                if screen_dist < min_screen_distance:
-                    min_screen_distance = screen_dist
-                    closest_sat_shell = s
-                    closest_sat_id = i
+        closest_sat_shell, closest_sat_id = self._pick_closest_satellite(clickPos)
         
         # 如果找到了最近的卫星，直接选中它
         if closest_sat_shell >= 0 and closest_sat_id >= 0:
@@ -492,44 +480,16 @@ class AnimationUI:
             return
             
         # 然后尝试检测地面站
-        # 遍历所有地面站点，检查点击位置是否在地面站附近
-        for gst_id in range(self.animation.gst_num):
-            # 获取地面站的世界坐标 - 直接从地面站演员获取最新位置
-            if self.animation.actors.gst_actor and self.animation.actors.gst_actor.satVtkPts:
-                gst_world_pos = [0, 0, 0]  # 初始化坐标
-                self.animation.actors.gst_actor.satVtkPts.GetPoint(gst_id, gst_world_pos)
-            else:
-                # 如果无法从演员获取，则使用存储的位置（可能不是最新的）
-                gst_coords = self.animation.gst_positions[gst_id]
-                gst_world_pos = [gst_coords['x'], gst_coords['y'], gst_coords['z']]
-                
-            # 使用vtkCoordinate进行坐标转换，这是VTK推荐的方式
-            coordinate = vtk.vtkCoordinate()
-            coordinate.SetCoordinateSystemToWorld()
-            coordinate.SetValue(gst_world_pos[0], gst_world_pos[1], gst_world_pos[2])
-            gst_screen_pos = coordinate.GetComputedDisplayValue(self.renderer)
-
-            # 如果点击位置在地面站点的一定范围内（增大点击区域）
-            if (gst_screen_pos and
-                 abs(clickPos[0] - gst_screen_pos[0]) < 15 and
-                abs(clickPos[1] - gst_screen_pos[1]) < 15):
-                print(f"点击了地面站: id={gst_id}")
-                self.animation.selected_object = "groundstation"
-                self.animation.selected_shell = -1
-                self.animation.selected_id = gst_id
-                self.updateGroundStationInfoPanel(gst_id)
-                return
-        
-        # 获取拾取的演员（vtkCellPicker返回的是vtkActor）
-        actor = picker.GetActor()
-         
-        if actor is None:
-            # 如果点击空白处，隐藏信息面板
-            self.hideInfoPanel()
+        gst_id = self._pick_closest_groundstation(clickPos)
+        if gst_id >= 0:
+            print(f"点击了地面站: id={gst_id}")
+            self.animation.selected_object = "groundstation"
+            self.animation.selected_shell = -1
+            self.animation.selected_id = gst_id
+            self.updateGroundStationInfoPanel(gst_id)
             return
         
-        # 如果到达这里，说明点击了其他对象
-        print(f"点击了未识别对象: {actor}")
+        # 屏幕坐标检测均未命中卫星或地面站，视为点击空白处，隐藏信息面板
         self.hideInfoPanel()
         
     def handleRightClick(self, obj: typing.Any, event: typing.Any) -> None:
@@ -558,75 +518,9 @@ class AnimationUI:
                 print("系统刚刚重置，请稍候再试...")
                 return
         
-        # 获取点击位置
-        clickPos = self.interactor.GetEventPosition()
-        
-        # 获取拾取器
-        picker = self.interactor.GetPicker()
-        
         # 首先尝试检测卫星点云（设置最高优先级）
         # 这是因为vtkPropPicker可能无法很好地拾取点云，所以我们使用屏幕坐标计算
-        clickPos = self.interactor.GetEventPosition()
-        closest_sat_shell = -1
-        closest_sat_id = -1
-        min_screen_distance = 20  # 屏幕像素距离阈值
-        
-        # 遍历所有shell中的卫星
-        for s in range(self.animation.num_shells):
-            if s >= len(self.animation.actors.shell_actors):
-                continue
-                
-            # 获取点云数据
-            points = None
-            if hasattr(self.animation.actors.shell_actors[s], 'satVtkPts'):
-                points = self.animation.actors.shell_actors[s].satVtkPts
-            elif hasattr(self.animation.actors.shell_inactive_actors[s], 'satVtkPts'):
-                points = self.animation.actors.shell_inactive_actors[s].satVtkPts
-                
-            if not points:
-                continue
-                
-            # 检查每个卫星点
-            for i in range(min(self.animation.shell_sats[s], points.GetNumberOfPoints())):
-                # 只检查在视图范围内的卫星
-                # 处理numpy.void类型和字典类型
-                try:
-                    # 如果是字典类型
-                    if hasattr(self.animation.sat_positions[s][i], 'get'):
-                        if not self.animation.sat_positions[s][i].get("in_bbox", True):
-                            continue
-                    # 如果是numpy.void类型
-                    elif hasattr(self.animation.sat_positions[s][i], 'item'):
-                        if 'in_bbox' in self.animation.sat_positions[s].dtype.names and not self.animation.sat_positions[s][i]['in_bbox']:
-                            continue
-                    # 其他情况，默认显示
-                except Exception as e:
-                    print(f"检查卫星可见性时出错: {e}")
-                    # 出错时默认显示该卫星
-                    pass
-                    
-                # 获取卫星世界坐标
-                sat_world_pos = [0, 0, 0]
-                points.GetPoint(i, sat_world_pos)
-                
-                # 转换为屏幕坐标
-                coordinate = vtk.vtkCoordinate()
-                coordinate.SetCoordinateSystemToWorld()
-                coordinate.SetValue(sat_world_pos[0], sat_world_pos[1], sat_world_pos[2])
-                sat_screen_pos = coordinate.GetComputedDisplayValue(self.renderer)
-                
-                if not sat_screen_pos:
-                    continue
-                    
-                # 计算屏幕距离
-                screen_dist = ((clickPos[0] - sat_screen_pos[0])**2 + 
-                              (clickPos[1] - sat_screen_pos[1])**2)**0.5
-                
-                # 如果距离小于阈值且小于当前最小距离
-                if screen_dist < min_screen_distance:
-                    min_screen_distance = screen_dist
-                    closest_sat_shell = s
-                    closest_sat_id = i
+        closest_sat_shell, closest_sat_id = self._pick_closest_satellite(clickPos)
         
         # 如果找到了最近的卫星，直接选中它
         if closest_sat_shell >= 0 and closest_sat_id >= 0:
@@ -655,167 +549,262 @@ class AnimationUI:
                 return
         
         # 然后尝试检测地面站（设置更高的优先级）
-        # 遍历所有地面站点，检查点击位置是否在地面站附近
-        for gst_id in range(self.animation.gst_num):
-            # 获取地面站的世界坐标 - 直接从地面站演员获取最新位置
-            if self.animation.actors.gst_actor and self.animation.actors.gst_actor.satVtkPts:
-                gst_world_pos = [0, 0, 0]  # 初始化坐标
-                self.animation.actors.gst_actor.satVtkPts.GetPoint(gst_id, gst_world_pos)
+        gst_id = self._pick_closest_groundstation(clickPos)
+        if gst_id >= 0:
+            # 如果没有选择起点，则设置为起点
+            if self.animation.route_source_type is None:
+                self.animation.route_source_type = "groundstation"
+                self.animation.route_source_shell = -1  # 地面站的shell始终为-1
+                self.animation.route_source_id = gst_id
+                print(f"Selected ground station {gst_id} as route source")
+                return
+            # 如果已有起点，则计算并显示路径
             else:
-                # 如果无法从演员获取，则使用存储的位置（可能不是最新的）
-                gst_coords = self.animation.gst_positions[gst_id]
-                gst_world_pos = [gst_coords['x'], gst_coords['y'], gst_coords['z']]
-                
-            # 使用vtkCoordinate进行坐标转换
-            coordinate = vtk.vtkCoordinate()
-            coordinate.SetCoordinateSystemToWorld()
-            coordinate.SetValue(gst_world_pos[0], gst_world_pos[1], gst_world_pos[2])
-            gst_screen_pos = coordinate.GetComputedDisplayValue(self.renderer)
-
-            # 如果点击位置在地面站点的一定范围内
-            if (gst_screen_pos and
-                 abs(clickPos[0] - gst_screen_pos[0]) < 15 and
-                abs(clickPos[1] - gst_screen_pos[1]) < 15):
-                # 如果没有选择起点，则设置为起点
-                if self.animation.route_source_type is None:
-                    self.animation.route_source_type = "groundstation"
-                    self.animation.route_source_shell = -1  # 地面站的shell始终为-1
-                    self.animation.route_source_id = gst_id
-                    print(f"Selected ground station {gst_id} as route source")
-                    return
-                # 如果已有起点，则计算并显示路径
-                else:
-                    self.animation.route_target_type = "groundstation"
-                    self.animation.route_target_shell = -1
-                    self.animation.route_target_id = gst_id
-                    # 调用Animation类中的showRoutePath方法
-                    self.animation.showRoutePath(
-                        self.animation.route_source_type,
-                        self.animation.route_source_shell,
-                        self.animation.route_source_id,
-                        self.animation.route_target_type,
-                        self.animation.route_target_shell,
-                        self.animation.route_target_id
-                    )
-                    return
+                self.animation.route_target_type = "groundstation"
+                self.animation.route_target_shell = -1
+                self.animation.route_target_id = gst_id
+                # 调用Animation类中的showRoutePath方法
+                self.animation.showRoutePath(
+                    self.animation.route_source_type,
+                    self.animation.route_source_shell,
+                    self.animation.route_source_id,
+                    self.animation.route_target_type,
+                    self.animation.route_target_shell,
+                    self.animation.route_target_id
+                )
+                return
         return
 
+    def _makeVisibilityCheck(self, structured_in_bbox: bool = True) -> typing.Callable[[int, int], bool]:
+        """
+        根据sat_positions中元素的类型生成卫星可见性（in_bbox）检查函数
+
+        卫星数据的类型在整个仿真过程中不变，因此只需检查一次，
+        避免在每颗卫星上重复进行hasattr判断
+
+        :param structured_in_bbox: 是否对numpy.void类型的数据检查in_bbox；
+            拾取时检查，活跃卫星计数时不检查（与原有计数方式一致）
+        """
+        sample = None
+        for shell_positions in self.animation.sat_positions:
+            if len(shell_positions) > 0:
+                sample = shell_positions[0]
+                break
+
+        # 如果是字典类型
+        if sample is not None and hasattr(sample, 'get'):
+            return lambda s, i: bool(self.animation.sat_positions[s][i].get("in_bbox", True))
+        # 如果是numpy.void类型
+        names = getattr(getattr(sample, 'dtype', None), 'names', None)
+        if structured_in_bbox and names and 'in_bbox' in names:
+            return lambda s, i: bool(self.animation.sat_positions[s][i]['in_bbox'])
+        # 其他情况，默认可见
+        return lambda s, i: True
+
+    def _selectSatExtractor(self, shell: int, sat_id: int) -> typing.Tuple[typing.Any, typing.Any, typing.Any, bool]:
+        """
+        根据sat_positions中元素的类型选定卫星信息提取函数，并替换self._extract_sat
+
+        与可见性检查一样，卫星数据的类型在仿真过程中不变，只需判断一次
+        """
+        sample = self.animation.sat_positions[shell][sat_id]
+        if getattr(getattr(self.animation.sat_positions[shell], 'dtype', None), 'names', None):
+            self._extract_sat = self._extractSatRecord
+        elif hasattr(sample, 'get'):
+            self._extract_sat = self._extractSatDict
+        else:
+            self._extract_sat = lambda s, i: (None, None, None, False)
+        return self._extract_sat(shell, sat_id)
+
+    def _extractSatRecord(self, shell: int, sat_id: int) -> typing.Tuple[typing.Any, typing.Any, typing.Any, bool]:
+        """从结构化数组中直接读取卫星的(x, y, z, in_bbox)，位置未知时x为None"""
+        sat = self.animation.sat_positions[shell][sat_id]
+        names = sat.dtype.names
+        active = bool(sat['in_bbox']) if 'in_bbox' in names else False
+        if 'x' in names and 'y' in names and 'z' in names:
+            return sat['x'], sat['y'], sat['z'], active
+        return None, None, None, active
+
+    def _extractSatDict(self, shell: int, sat_id: int) -> typing.Tuple[typing.Any, typing.Any, typing.Any, bool]:
+        """从字典形式的卫星数据中读取(x, y, z, in_bbox)，位置未知时x为None"""
+        sat = self.animation.sat_positions[shell][sat_id]
+        active = bool(sat.get('in_bbox', False))
+        if 'x' in sat and 'y' in sat and 'z' in sat:
+            return sat['x'], sat['y'], sat['z'], active
+        return None, None, None, active
+
+    def _visible_mask(self, s: int, n: int) -> np.ndarray:
+        """
+        获取壳层s中前n颗卫星的可见性（in_bbox）掩码
+        """
+        positions = self.animation.sat_positions[s]
+        names = getattr(getattr(positions, 'dtype', None), 'names', None)
+        if names and 'in_bbox' in names:
+            return np.asarray(positions['in_bbox'][:n], dtype=np.bool_)
+        return np.fromiter((self._is_visible(s, i) for i in range(n)), dtype=np.bool_, count=n)
+
+    def _get_shell_coords(self, s: int) -> typing.Optional[np.ndarray]:
+        """
+        获取壳层s中卫星点的世界坐标，形状为(N, 3)的numpy视图
+
+        点集未被修改（MTime不变）时直接返回缓存的数组，避免重复包装
+        """
+        points = self.animation.actors.shell_actors[s].satVtkPts
+        if not points:
+            return None
+
+        mtime = points.GetMTime()
+        cached = self._cached_coords.get(s)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        coords = numpy_support.vtk_to_numpy(points.GetData()).reshape(-1, 3)
+        self._cached_coords[s] = (mtime, coords)
+        return coords
+
+    def _pick_closest_satellite(self, clickPos: typing.Tuple[int, int]) -> typing.Tuple[int, int]:
+        """
+        在屏幕坐标中查找距离点击位置最近的卫星
+
+        :param clickPos: 点击位置（显示坐标）
+        :return: (shell, id)，未找到时为(-1, -1)
+        """
+        closest_sat_shell = -1
+        closest_sat_id = -1
+        min_screen_distance2 = float(PICK_SAT_DISTANCE2)  # 屏幕像素距离阈值的平方
+
+        m, origin, size = self._display_projection()
+
+        # 遍历所有shell中的卫星
+        for s in range(self.animation.num_shells):
+            if s >= len(self.animation.actors.shell_actors):
+                continue
+                
+            # 获取点云坐标
+            coords = self._get_shell_coords(s)
+            if coords is None:
+                continue
+
+            # 只检查在视图范围内的卫星
+            n = min(self.animation.shell_sats[s], len(coords))
+            mask = self._visible_mask(s, n)
+
+            # 投影、距离计算与取最小值在编译内核中一次完成
+            i, d2 = nearest_sat(coords[:n], m, mask, float(clickPos[0]), float(clickPos[1]),
+                                float(origin[0]), float(origin[1]), float(size[0]), float(size[1]),
+                                min_screen_distance2)
+
+            # 如果距离小于阈值且小于当前最小距离
+            if i >= 0:
+                min_screen_distance2 = d2
+                closest_sat_shell = s
+                closest_sat_id = int(i)
+
+        return closest_sat_shell, closest_sat_id
+
+    def _get_gst_coords(self) -> np.ndarray:
+        """
+        获取所有地面站的世界坐标，形状为(G, 3)
+
+        优先使用地面站演员的点集（最新位置），点集MTime不变时复用缓存
+        """
+        gst_actor = self.animation.actors.gst_actor
+        if gst_actor and gst_actor.satVtkPts:
+            mtime = gst_actor.satVtkPts.GetMTime()
+            if self._gst_world is not None and self._gst_world[0] == mtime:
+                return self._gst_world[1]
+            coords = numpy_support.vtk_to_numpy(gst_actor.satVtkPts.GetData()).reshape(-1, 3)
+            self._gst_world = (mtime, coords)
+            return coords
+
+        # 如果无法从演员获取，则使用存储的位置（可能不是最新的）
+        gst_positions = self.animation.gst_positions
+        return np.array([[g['x'], g['y'], g['z']] for g in gst_positions], dtype=np.float64).reshape(-1, 3)
+
+    def _display_projection(self) -> typing.Tuple[np.ndarray, typing.Tuple[int, int], typing.Tuple[int, int]]:
+        """
+        获取世界坐标到显示坐标的转换参数
+
+        :return: (4x4复合投影矩阵, 渲染器原点, 渲染器大小)
+        """
+        camera = self.renderer.GetActiveCamera()
+        matrix = camera.GetCompositeProjectionTransformMatrix(self.renderer.GetTiledAspectRatio(), -1, 1)
+        m = np.array([[matrix.GetElement(r, c) for c in range(4)] for r in range(4)])
+        return m, self.renderer.GetOrigin(), self.renderer.GetSize()
+
+    def _world_to_display(self, world: np.ndarray) -> np.ndarray:
+        """
+        将(N, 3)世界坐标批量转换为(N, 2)显示坐标
+
+        与vtkCoordinate的World->Display转换一致，但一次矩阵乘法完成所有点，
+        位于相机后方的点返回nan
+        """
+        m, origin, size = self._display_projection()
+
+        view = world @ m[:3, :3].T + m[:3, 3]
+        w = world @ m[3, :3] + m[3, 3]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ndc = view[:, :2] / np.where(w > 0, w, np.nan)[:, None]
+
+        display = np.empty_like(ndc)
+        display[:, 0] = origin[0] + (ndc[:, 0] + 1.0) * 0.5 * size[0]
+        display[:, 1] = origin[1] + (ndc[:, 1] + 1.0) * 0.5 * size[1]
+        return display
+
+    def _pick_closest_groundstation(self, clickPos: typing.Tuple[int, int]) -> int:
+        """
+        在屏幕坐标中查找距离点击位置最近的地面站
+
+        :param clickPos: 点击位置（显示坐标）
+        :return: 地面站ID，未找到时为-1
+        """
+        if self.animation.gst_num <= 0:
+            return -1
+
+        coords = self._get_gst_coords()[:self.animation.gst_num]
+        if len(coords) == 0:
+            return -1
+
+        display = self._world_to_display(coords)
+        dx = display[:, 0] - clickPos[0]
+        dy = display[:, 1] - clickPos[1]
+        dist2 = np.nan_to_num(dx * dx + dy * dy, nan=np.inf)
+
+        # 点击位置在地面站阈值范围内（比较距离的平方）
+        gst_id = int(np.argmin(dist2))
+        if dist2[gst_id] < PICK_GST_DISTANCE2:
+            return gst_id
+        return -1
+
     def updateSatelliteInfoPanel(self, shell: int, sat_id: int) -> None:
         """更新卫星信息面板"""
         if not self.info_panel_actor or shell < 0 or shell >= self.animation.num_shells or sat_id < 0 or sat_id >= self.animation.shell_sats[shell]:
             return
 
-        # 获取卫星信息
-        sat = self.animation.sat_positions[shell][sat_id]
-        # 创建一个字典来存储卫星信息，确保统一访问方式
-        sat_info = {}
-        try:
-            # 如果是字典类型
-            if hasattr(sat, 'get'):
-                for key in sat.keys():
-                    sat_info[key] = sat[key]
-            # 如果是numpy.void类型
-            elif hasattr(sat, 'item'):
-                for name in self.animation.sat_positions[shell].dtype.names:
-                    sat_info[name] = sat[name]
-            else:
-                # 其他情况，尝试直接转换为字典
-                sat_info = dict(sat)
-        except Exception as e:
-            print(f"处理卫星信息时出错: {e}")
-            # 创建基本信息
-            sat_info = {'ID': sat_id}
-
         # 计算卫星IP地址 - 确保使用正确的shell标识符
         # 使用shell确保IP地址计算与显示的SHELL-ID一致
         ipv6 = self.calculateIPv6(shell + 1, sat_id)  # shell_identifier从1开始
         ipv4 = self.calculateIPv4(shell + 1, sat_id)
-        
-        # 使用sat_info代替sat，确保统一访问方式
 
-        # 固定面板位置在屏幕右上角
-        window_size = self.renderWindow.GetSize()
-        panel_pos_x = window_size[0] - INFO_PANEL_WIDTH - 20  # 右边距20像素
-        panel_pos_y = window_size[1] - 20  # 顶部边距20像素
-        self.info_panel_actor.SetPosition(panel_pos_x, panel_pos_y)
+        # 读取卫星位置和状态（按数据类型预先选定的提取函数）
+        x, y, z, is_active = self._extract_sat(shell, sat_id)
+        if x is None:
+            position_line = "Position: Unknown"
+        else:
+            position_line = f"Position: ({x:.0f}, {y:.0f}, {z:.0f})"
+        status_line = f"Status: {'Active' if is_active else 'Inactive'}"
 
         # 更新面板文本
-        self.info_panel_text_actors[0].SetInput(f"Satellite Info")
         # 确保使用正确的shell和sat_id，这里使用当前点击的卫星的实际索引
-        self.info_panel_text_actors[1].SetInput(f"SHELL-ID: {shell+1}-{sat_id}")
-        self.info_panel_text_actors[2].SetInput(f"IPv6: {ipv6}")
-        
-        # 显示IPv4地址
-        self.info_panel_text_actors[3].SetInput(f"IPv4: {ipv4}")
-        
-        # 使用sat_info显示位置信息
-        try:
-            if 'x' in sat_info and 'y' in sat_info and 'z' in sat_info:
-                self.info_panel_text_actors[4].SetInput(f"Position: ({sat_info['x']:.0f}, {sat_info['y']:.0f}, {sat_info['z']:.0f})")
-            elif hasattr(sat, 'item') and all(attr in self.animation.sat_positions[shell].dtype.names for attr in ['x', 'y', 'z']):
-                self.info_panel_text_actors[4].SetInput(f"Position: ({sat['x']:.0f}, {sat['y']:.0f}, {sat['z']:.0f})")
-            else:
-                self.info_panel_text_actors[4].SetInput(f"Position: Unknown")
-        except Exception as e:
-            print(f"显示卫星位置信息时出错: {e}")
-            self.info_panel_text_actors[4].SetInput(f"Position: Unknown")
-        # 显示卫星状态
-        try:
-            if hasattr(sat, 'get'):
-                is_active = sat.get('in_bbox', False)
-            elif hasattr(sat, 'item') and 'in_bbox' in self.animation.sat_positions[shell].dtype.names:
-                is_active = bool(sat['in_bbox'])
-            else:
-                is_active = 'in_bbox' in sat_info and sat_info['in_bbox']
-                
-            self.info_panel_text_actors[5].SetInput(f"Status: {'Active' if is_active else 'Inactive'}")
-        except Exception as e:
-            print(f"显示卫星状态时出错: {e}")
-            self.info_panel_text_actors[5].SetInput(f"Status: Unknown")
-
-        # 调整面板大小以容纳SSH按钮
-        panel_height = 6 * INFO_PANEL_LINE_HEIGHT + INFO_PANEL_SSH_BTN_HEIGHT + 3 * INFO_PANEL_PADDING
-        points = self.info_panel_actor.GetMapper().GetInput().GetPoints()
-        points.SetPoint(2, INFO_PANEL_WIDTH, -panel_height, 0)
-        points.SetPoint(3, 0, -panel_height, 0)
-        points.Modified()
-
-        # 更新文本位置
-        for i in range(6):
-            self.info_panel_text_actors[i].SetPosition(
-                panel_pos_x + INFO_PANEL_PADDING,
-                panel_pos_y - INFO_PANEL_PADDING - (i + 1) * INFO_PANEL_LINE_HEIGHT  # 向下调整一行的高度
-            )
-            self.info_panel_text_actors[i].VisibilityOn()
-
-        # 隐藏未使用的文本
-        for i in range(6, len(self.info_panel_text_actors)):
-            self.info_panel_text_actors[i].VisibilityOff()
-
-        # 更新关闭按钮位置
-        self.info_panel_close_btn.SetPosition(
-            panel_pos_x + INFO_PANEL_WIDTH - INFO_PANEL_CLOSE_BTN_SIZE - INFO_PANEL_PADDING,
-            panel_pos_y
-        )
-        self.info_panel_close_btn.VisibilityOn()
-
-        # 更新SSH按钮位置
-        ssh_btn_y = panel_pos_y - 6 * INFO_PANEL_LINE_HEIGHT - 2 * INFO_PANEL_PADDING
-        self.info_panel_ssh_btn.SetPosition(
-            panel_pos_x + INFO_PANEL_WIDTH/2 - INFO_PANEL_SSH_BTN_WIDTH/2,
-            ssh_btn_y
-        )
-        self.info_panel_ssh_btn.VisibilityOn()
-
-        # 更新SSH按钮文本位置
-        self.ssh_btn_text.SetPosition(
-            panel_pos_x + INFO_PANEL_WIDTH/2,
-            ssh_btn_y - INFO_PANEL_SSH_BTN_HEIGHT/2
-        )
-        self.ssh_btn_text.VisibilityOn()
-
-        # 显示面板
-        self.info_panel_actor.VisibilityOn()
+        lines = [
+            "Satellite Info",
+            f"SHELL-ID: {shell+1}-{sat_id}",
+            f"IPv6: {ipv6}",
+            f"IPv4: {ipv4}",
+            position_line,
+            status_line,
+        ]
+        self._updateInfoPanel(lines)
         
     def updateGroundStationInfoPanel(self, gst_id: int) -> None:
         """更新地面站信息面板"""
@@ -835,134 +824,121 @@ class AnimationUI:
         if hasattr(self.animation, 'gst_names') and self.animation.gst_names and gst_id < len(self.animation.gst_names):
             name = self.animation.gst_names[gst_id] or "Unknown"  # 使用or运算符简化逻辑
         
-        # 固定面板位置在屏幕右上角
-        window_size = self.renderWindow.GetSize()
-        panel_pos_x = window_size[0] - INFO_PANEL_WIDTH - 20  # 右边距20像素
-        panel_pos_y = window_size[1] - 20  # 顶部边距20像素
-        self.info_panel_actor.SetPosition(panel_pos_x, panel_pos_y)
         
         # 更新面板文本
-        self.info_panel_text_actors[0].SetInput(f"Ground Station Info")
-        self.info_panel_text_actors[1].SetInput(f"Name: {name}")
-        self.info_panel_text_actors[2].SetInput(f"ID: {gst_id}")
-        self.info_panel_text_actors[3].SetInput(f"IPv6: {ipv6}")
-        self.info_panel_text_actors[4].SetInput(f"IPv4: {ipv4}")
-        self.info_panel_text_actors[5].SetInput(f"Position: ({gst['x']:.0f}, {gst['y']:.0f}, {gst['z']:.0f})")
-        
-        # 调整面板大小以容纳SSH按钮
-        panel_height = 6 * INFO_PANEL_LINE_HEIGHT + INFO_PANEL_SSH_BTN_HEIGHT + 3 * INFO_PANEL_PADDING
-        points = self.info_panel_actor.GetMapper().GetInput().GetPoints()
-        points.SetPoint(2, INFO_PANEL_WIDTH, -panel_height, 0)
-        points.SetPoint(3, 0, -panel_height, 0)
-        points.Modified()
-        
-        # 更新文本位置
-        for i in range(6):
-            self.info_panel_text_actors[i].SetPosition(
-                panel_pos_x + INFO_PANEL_PADDING,
-                panel_pos_y - INFO_PANEL_PADDING - (i + 1) * INFO_PANEL_LINE_HEIGHT  # 向下调整一行的高度
-            )
-            self.info_panel_text_actors[i].VisibilityOn()
-        
-        # 隐藏未使用的文本
-        for i in range(6, len(self.info_panel_text_actors)):
-            self.info_panel_text_actors[i].VisibilityOff()
+        lines = [
+            "Ground Station Info",
+            f"Name: {name}",
+            f"ID: {gst_id}",
+            f"IPv6: {ipv6}",
+            f"IPv4: {ipv4}",
+            f"Position: ({gst['x']:.0f}, {gst['y']:.0f}, {gst['z']:.0f})",
+        ]
+        self._updateInfoPanel(lines)
+
+    def _updateInfoPanel(self, lines: typing.List[str]) -> None:
+        """
+        用给定的6行文本更新信息面板并显示
+
+        :param lines: 面板中自上而下显示的文本行
+        """
+        self.info_panel_text.SetInput("\n".join(lines))
+
+        # 布局面板元素，面板固定在屏幕右上角（位置未变化时跳过）
+        self._layoutInfoPanel(*self._panel_origin)
+
+        # 显示面板
+        self.showInfoPanel()
         
-        # 更新关闭按钮位置
-        self.info_panel_close_btn.SetPosition(
-            panel_pos_x + INFO_PANEL_WIDTH - INFO_PANEL_CLOSE_BTN_SIZE - INFO_PANEL_PADDING,
-            panel_pos_y
+    def _onWindowModified(self, obj: typing.Any, event: typing.Any) -> None:
+        """渲染窗口被修改（如大小改变）时，重新计算信息面板左上角位置"""
+        window_size = self.renderWindow.GetSize()
+        # 固定面板位置在屏幕右上角，右边距和顶部边距均为20像素
+        self._panel_origin = (window_size[0] - INFO_PANEL_WIDTH - 20, window_size[1] - 20)
+
+    def _layoutInfoPanel(self, panel_pos_x: float, panel_pos_y: float) -> None:
+        """
+        将面板背景、文本和按钮布局到以(panel_pos_x, panel_pos_y)为左上角的位置
+
+        面板固定在窗口角落，而不是跟随所选对象移动，因此只有位置发生变化
+        （首次显示或窗口大小改变）时才需要重新布局，每帧刷新只更新文本
+        """
+        if self._panel_layout_pos == (panel_pos_x, panel_pos_y):
+            return
+        self._panel_layout_pos = (panel_pos_x, panel_pos_y)
+
+        self.info_panel_actor.SetPosition(panel_pos_x, panel_pos_y)
+
+        # 更新文本位置（多行文本底部对齐到最后一行）
+        self.info_panel_text.SetPosition(panel_pos_x + INFO_PANEL_PADDING, panel_pos_y - self._PANEL_TEXT_DY)
+
+        # 更新关闭按钮位置（按钮以左上角定位，向下延伸）
+        close_btn_x = panel_pos_x + INFO_PANEL_WIDTH - INFO_PANEL_CLOSE_BTN_SIZE - INFO_PANEL_PADDING
+        self.info_panel_close_btn.SetPosition(close_btn_x, panel_pos_y)
+        self._close_btn_bbox = (
+            close_btn_x, panel_pos_y - INFO_PANEL_CLOSE_BTN_SIZE,
+            close_btn_x + INFO_PANEL_CLOSE_BTN_SIZE, panel_pos_y
         )
-        self.info_panel_close_btn.VisibilityOn()
-        
+
         # 更新SSH按钮位置
-        ssh_btn_y = panel_pos_y - 6 * INFO_PANEL_LINE_HEIGHT - 2 * INFO_PANEL_PADDING
-        self.info_panel_ssh_btn.SetPosition(
-            panel_pos_x + INFO_PANEL_WIDTH/2 - INFO_PANEL_SSH_BTN_WIDTH/2,
-            ssh_btn_y
+        center_x = panel_pos_x + INFO_PANEL_WIDTH/2
+        ssh_btn_x = center_x - INFO_PANEL_SSH_BTN_WIDTH/2
+        ssh_btn_y = panel_pos_y - self._PANEL_SSH_BTN_DY
+        self.info_panel_ssh_btn.SetPosition(ssh_btn_x, ssh_btn_y)
+        self._ssh_btn_bbox = (
+            ssh_btn_x, ssh_btn_y - INFO_PANEL_SSH_BTN_HEIGHT,
+            ssh_btn_x + INFO_PANEL_SSH_BTN_WIDTH, ssh_btn_y
         )
-        self.info_panel_ssh_btn.VisibilityOn()
-        
+
         # 更新SSH按钮文本位置
-        self.ssh_btn_text.SetPosition(
-            panel_pos_x + INFO_PANEL_WIDTH/2,
-            ssh_btn_y - INFO_PANEL_SSH_BTN_HEIGHT/2
-        )
-        self.ssh_btn_text.VisibilityOn()
-        
-        # 显示面板
-        self.info_panel_actor.VisibilityOn()
-        
+        self.ssh_btn_text.SetPosition(center_x, ssh_btn_y - INFO_PANEL_SSH_BTN_HEIGHT/2)
+
     def resizeInfoPanel(self, height: float) -> None:
         """调整信息面板高度"""
         if not self.info_panel_actor:
             return
-            
-        # 创建新的点集合
-        panel_points = vtk.vtkPoints()
-        panel_points.InsertNextPoint(0, 0, 0)  # 左上
-        panel_points.InsertNextPoint(INFO_PANEL_WIDTH, 0, 0)  # 右上
-        panel_points.InsertNextPoint(INFO_PANEL_WIDTH, -height, 0)  # 右下
-        panel_points.InsertNextPoint(0, -height, 0)  # 左下
-        
-        # 创建新的单元格数组
-        panel_cells = vtk.vtkCellArray()
-        panel_cells.InsertNextCell(4)
-        panel_cells.InsertCellPoint(0)
-        panel_cells.InsertCellPoint(1)
-        panel_cells.InsertCellPoint(2)
-        panel_cells.InsertCellPoint(3)
-        
-        # 创建新的多边形数据
-        panel_poly_data = vtk.vtkPolyData()
-        panel_poly_data.SetPoints(panel_points)
-        panel_poly_data.SetPolys(panel_cells)
-        
-        # 更新映射器输入数据
-        self.info_panel_actor.GetMapper().SetInputData(panel_poly_data)
-        self.info_panel_actor.GetMapper().Update()
+
+        self._set_panel_height(height)
+
+    def _set_panel_height(self, height: float) -> None:
+        """原地修改面板底部两个顶点以调整面板高度，高度未变化时不做任何修改"""
+        if height == self._panel_height:
+            return
+        self._panel_height = height
+
+        self._panel_points.SetPoint(2, INFO_PANEL_WIDTH, -height, 0)  # 右下
+        self._panel_points.SetPoint(3, 0, -height, 0)  # 左下
+        self._panel_points.Modified()
         
     def showInfoPanel(self) -> None:
         """显示信息面板"""
         if not self.info_panel_actor:
             return
-            
-        # 显示面板背景
-        self.info_panel_actor.VisibilityOn()
-        
-        # 显示关闭按钮
-        self.info_panel_close_btn.VisibilityOn()
-        
-        # 显示文本
-        for actor in self.info_panel_text_actors:
-            actor.VisibilityOn()
+
+        # 首次显示时才将面板添加到渲染器
+        if not self._panel_assembly_added:
+            self.renderer.AddViewProp(self._panel_assembly)
+            self._panel_assembly_added = True
+
+        self._panel_assembly.VisibilityOn()
             
     def hideInfoPanel(self) -> None:
         """隐藏信息面板"""
         if not self.info_panel_actor:
             return
             
-        # 隐藏面板背景
-        self.info_panel_actor.VisibilityOff()
-        
-        # 隐藏关闭按钮
-        self.info_panel_close_btn.VisibilityOff()
-        
-        # 隐藏SSH按钮
-        self.info_panel_ssh_btn.VisibilityOff()
-        self.ssh_btn_text.VisibilityOff()
-        
-        # 隐藏文本
-        for actor in self.info_panel_text_actors:
-            actor.VisibilityOff()
+        # 隐藏面板背景、按钮和文本
+        self._panel_assembly.VisibilityOff()
             
         # 重置选择状态
         self.animation.selected_object = None
         self.animation.selected_shell = -1
         self.animation.selected_id = -1
         
-    def calculateIPv6(self, shell: int, node_id: int) -> str:
-        """根据shell和node_id计算IPv6地址"""
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def calculateIPv6(shell: int, node_id: int) -> str:
+        """根据shell和node_id计算IPv6地址（结果只取决于参数，缓存复用）"""
         byte1 = 10  # 固定为10
         byte2 = shell  # shell标识符
         byte3 = (node_id >> 6) & 0xFF  # 节点标识符，右移6位
@@ -972,8 +948,10 @@ class AnimationUI:
         ipv6_address = f"fd00::{byte1:x}:{byte2:x}:{byte3:x}:{(byte4 + 2):x}"
         return ipv6_address
         
-    def calculateIPv4(self, shell: int, node_id: int) -> str:
-        """根据shell和node_id计算IPv4地址"""
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def calculateIPv4(shell: int, node_id: int) -> str:
+        """根据shell和node_id计算IPv4地址（结果只取决于参数，缓存复用）"""
         byte1 = 10  # 固定为10
         byte2 = shell  # shell标识符
         byte3 = (node_id >> 6) & 0xFF  # 节点标识符，右移6位
@@ -1011,19 +989,30 @@ class AnimationUI:
             print("Failed to get IP address for SSH connection")
             return
 
+        if self._terminal_argv is None:
+            print("Failed to open terminal. Neither gnome-terminal nor xterm is available.")
+            return
+
         # 构建SSH命令
-        ssh_key_path = os.path.expanduser(SSH_KEY_PATH)  # 展开波浪号为用户主目录
-        ssh_command = f"ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null -i {ssh_key_path} root@{ip_address}"
+        ssh_command = f"{self._ssh_command_prefix}{ip_address}"
 
         try:
-            # 使用gnome-terminal或xterm启动新终端并执行SSH命令
-            # 尝试使用gnome-terminal，添加--title参数设置窗口标题
-            subprocess.Popen(["gnome-terminal", "--title", terminal_title, "--", "bash", "-c", ssh_command])
-        except FileNotFoundError:
-            try:
-                # 如果gnome-terminal不可用，尝试使用xterm，添加-title参数设置窗口标题
-                subprocess.Popen(["xterm", "-title", terminal_title, "-e", ssh_command])
-            except FileNotFoundError:
-                print("Failed to open terminal. Neither gnome-terminal nor xterm is available.")
+            # 使用启动时检测到的终端（gnome-terminal或xterm）打开新窗口并执行SSH命令
+            subprocess.Popen(self._terminal_argv(terminal_title, ssh_command))
         except Exception as e:
             print(f"Error executing SSH command: {e}")
+
+    @staticmethod
+    def _findTerminal() -> typing.Optional[typing.Callable[[str, str], typing.List[str]]]:
+        """
+        检测可用的终端程序，返回根据窗口标题和命令构建参数列表的函数
+
+        优先使用gnome-terminal，其次是xterm，都不可用时返回None
+        """
+        gnome_terminal = shutil.which("gnome-terminal")
+        if gnome_terminal:
+            return lambda title, command: [gnome_terminal, "--title", title, "--", "bash", "-c", command]
+        xterm = shutil.which("xterm")
+        if xterm:
+            return lambda title, command: [xterm, "-title", title, "-e", command]
+        return None
@@ -18,18 +18,32 @@
 """SRv6路由可视化服务器，接收路由管理器发送的路由信息并转发给动画系统"""
 
 import threading
+import queue
+from collections import OrderedDict
 import logging
 import json
 import time
+import functools
 import ipaddress
 from typing import Dict, List, Optional, Any
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from multiprocessing.connection import Connection as MultiprocessingConnection
 
+# orjson可用时使用它解析请求数据，其JSONDecodeError是json.JSONDecodeError的子类
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("SRv6RouteServer")
 
+# 固定的响应内容，预先序列化，避免每个请求都调用json.dumps
+OK_BODY = b'{"status": "success", "message": "Route data received"}'
+STATUS_TEMPLATE = '{"status": "running", "routes_count": %d, "timestamp": %r}'
+
 class SRv6RouteData:
     """SRv6路由数据结构"""
     def __init__(self, data: Dict[str, Any]):
@@ -44,11 +58,11 @@ class SRv6RouteData:
         """获取源节点的shell和id信息"""
         if self.node_info and "shell" in self.node_info and "id" in self.node_info:
             return self.node_info["shell"], self.node_info["id"]
-        return self._parse_ipv6_to_node_info(self.source_ip)
+        return self._lookup_node_info(self.source_ip)
     
     def get_destination_node_info(self) -> tuple:
         """获取目标节点的shell和id信息"""
-        return self._parse_ipv6_to_node_info(self.destination_ip)
+        return self._lookup_node_info(self.destination_ip)
     
     def get_segment_node_infos(self) -> List[tuple]:
         """获取所有中间节点的shell和id信息
@@ -57,20 +71,54 @@ class SRv6RouteData:
         if not self.segments:
             # 处理简化的路由数据情况，返回空列表
             return []
-        return [self._parse_ipv6_to_node_info(segment) for segment in self.segments]
+        addr_index = SRv6RouteServer.addr_index
+        return [addr_index.get(segment) or self._parse_ipv6_to_node_info(segment) for segment in self.segments]
+
+    @staticmethod
+    def _lookup_node_info(ipv6_str: str) -> tuple:
+        """查找IPv6地址对应的节点信息(shell, id)，优先使用服务器预先构建的地址索引"""
+        node_info = SRv6RouteServer.addr_index.get(ipv6_str)
+        if node_info is not None:
+            return node_info
+        return SRv6RouteData._parse_ipv6_to_node_info(ipv6_str)
     
-    def _parse_ipv6_to_node_info(self, ipv6_str: str) -> tuple:
-        """将IPv6地址解析为节点信息(shell, id)"""
+    @staticmethod
+    @functools.lru_cache(maxsize=65536)
+    def _parse_ipv6_to_node_info(ipv6_str: str) -> tuple:
+        """将IPv6地址解析为节点信息(shell, id)，路由中反复出现相同的段，按原始字符串缓存结果"""
+        # 快速路径：地址格式为fd00::a:b:c:d，直接按冒号拆分取最后三段，
+        # 无需构造IPv6Address对象再规范化
+        addr = ipv6_str.lower()
+        if addr.startswith("fd00:"):
+            parts = addr.split(":")
+            if len(parts) >= 4:
+                try:
+                    b = int(parts[-3], 16)
+                    c = int(parts[-2], 16)
+                    d = int(parts[-1], 16)
+                    return b, (c << 6) | ((d - 2) >> 2)
+                except ValueError:
+                    # 非常规写法（如末尾压缩的零段），交给ipaddress处理
+                    pass
+
+        return SRv6RouteData._parse_ipv6_slow(ipv6_str)
+
+    @staticmethod
+    def _parse_ipv6_slow(ipv6_str: str) -> tuple:
+        """使用ipaddress规范化后解析IPv6地址，处理快速路径无法识别的写法"""
         try:
             # 确保是有效的IPv6地址
             ipv6 = ipaddress.IPv6Address(ipv6_str)
             
+            # 规范化形式只生成一次
+            compressed = ipv6.compressed
+
             # 只处理fd00::/16地址
-            if not str(ipv6).startswith("fd00:"):
+            if not compressed.startswith("fd00:"):
                 return 0, 0
                 
             # 解析地址格式: fd00::a:b:c:d
-            parts = str(ipv6).split(":")[-4:]
+            parts = compressed.split(":")[-4:]
             if len(parts) < 4:
                 return 0, 0
                 
@@ -92,9 +140,16 @@ class SRv6RouteData:
 class SRv6RouteHandler(BaseHTTPRequestHandler):
     """处理SRv6路由请求的HTTP处理器"""
     
-    # 类变量，存储最近的路由数据
-    recent_routes: Dict[str, SRv6RouteData] = {}
+    # 类变量，存储最近的路由数据，超过上限时淘汰最久未更新的路由
+    recent_routes: "OrderedDict[str, SRv6RouteData]" = OrderedDict()
+    recent_routes_lock = threading.Lock()
+    MAX_RECENT_ROUTES = 10000
     
+    def log_message(self, format, *args):
+        """将每个请求的访问日志交给logger的DEBUG级别，默认不再逐条写入stderr"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
     def get_animation_conn(self):
         """获取动画连接，直接从SRv6RouteServer获取"""
         # 直接从服务器类变量获取，简化连接对象管理
@@ -111,12 +166,8 @@ class SRv6RouteHandler(BaseHTTPRequestHandler):
             self.send_response(200)
             self.send_header("Content-type", "application/json")
             self.end_headers()
-            status = {
-                "status": "running",
-                "routes_count": len(self.recent_routes),
-                "timestamp": time.time()
-            }
-            self.wfile.write(json.dumps(status).encode())
+            status = STATUS_TEMPLATE % (len(self.recent_routes), time.time())
+            self.wfile.write(status.encode())
         else:
             self.send_response(404)
             self.send_header("Content-type", "text/plain")
@@ -130,15 +181,21 @@ class SRv6RouteHandler(BaseHTTPRequestHandler):
             post_data = self.rfile.read(content_length)
             
             try:
-                route_data = json.loads(post_data.decode('utf-8'))
-                # logger.info(f"接收到路由数据: {route_data['source']} -> {route_data['destination']}")
+                # 直接解析字节数据，无需先解码为字符串
+                route_data = json_loads(post_data)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("接收到路由数据: %s -> %s", route_data.get("source"), route_data.get("destination"))
                 
                 # 解析路由数据
                 srv6_route = SRv6RouteData(route_data)
                 
                 # 存储路由数据
                 route_key = f"{srv6_route.source_ip}->{srv6_route.destination_ip}"
-                self.recent_routes[route_key] = srv6_route
+                with self.recent_routes_lock:
+                    self.recent_routes[route_key] = srv6_route
+                    self.recent_routes.move_to_end(route_key)
+                    if len(self.recent_routes) > self.MAX_RECENT_ROUTES:
+                        self.recent_routes.popitem(last=False)
                 
                 # 获取动画连接，使用新的get_animation_conn方法
                 animation_conn = self.get_animation_conn()
@@ -172,15 +229,13 @@ class SRv6RouteHandler(BaseHTTPRequestHandler):
                         }
                         
                         # 发送到动画进程前记录详细信息
-                        # logger.info(f"准备发送路由数据到动画进程，详细信息: {json.dumps(route_msg)}")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("准备发送路由数据到动画进程，详细信息: %s", route_msg)
                         try:
                             
-                            # 直接使用获取到的连接对象发送消息
-                            animation_conn.send(route_msg)
-                            
-                            # logger.info(f"已成功发送路由数据到动画进程: {source_shell}/{source_id} -> {target_shell}/{target_id}")
-                            # 发送后等待一小段时间，确保消息被处理
-                            time.sleep(0.1)
+                            # 放入发送队列，由后台线程合并后批量发送到动画进程
+                            SRv6RouteServer.route_queue.put(route_msg)
+                            logger.debug("已加入发送队列: %s/%s -> %s/%s", source_shell, source_id, target_shell, target_id)
                         except Exception as e:
                             logger.error(f"发送路由数据到动画进程失败: {e}")
                             import traceback
@@ -194,8 +249,7 @@ class SRv6RouteHandler(BaseHTTPRequestHandler):
                 self.send_response(200)
                 self.send_header("Content-type", "application/json")
                 self.end_headers()
-                response = {"status": "success", "message": "Route data received"}
-                self.wfile.write(json.dumps(response).encode())
+                self.wfile.write(OK_BODY)
             except json.JSONDecodeError as e:
                 logger.error(f"解析JSON数据出错: {e}")
                 self.send_response(400)
@@ -221,19 +275,40 @@ class SRv6RouteServer:
     
     # 添加类变量存储animation_conn，确保所有处理器实例都能访问
     animation_conn_instance = None
+
+    # 类变量，只串行化本服务器各线程（请求处理线程和批量发送线程）对animation_conn的写入；
+    # 星座主循环（AnimationConstellation）向同一管道发送消息时不经过此锁
+    send_lock = threading.Lock()
+
+    # 类变量，待发送到动画进程的路由消息队列，由批量发送线程合并后发送
+    route_queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+
+    # 每批最多合并的消息数和收集一批消息的最长时间（秒）
+    BATCH_MAX_MESSAGES = 64
+    BATCH_MAX_DELAY = 0.02
+
+    # 类变量，规范形式的节点IPv6地址 -> (shell, id)，避免每个请求都解析地址
+    addr_index: Dict[str, tuple] = {}
     
-    def __init__(self, host="0.0.0.0", port=8080, animation_conn=None):
+    def __init__(self, host="0.0.0.0", port=8080, animation_conn=None,
+                 shell_sats: Optional[List[int]] = None, gst_num: int = 0):
         """初始化服务器
         
         :param host: 服务器主机地址
         :param port: 服务器端口
         :param animation_conn: 与动画进程的连接
+        :param shell_sats: 每个shell的卫星数，用于构建地址索引
+        :param gst_num: 地面站数量，用于构建地址索引
         """
         self.host = host
         self.port = port
         self.server = None
         self.server_thread = None
+        self.batch_thread = None
         self.running = False
+
+        if shell_sats is not None:
+            SRv6RouteServer.build_addr_index(shell_sats, gst_num)
         
         if animation_conn is None:
             logger.warning("警告: 动画连接为None，路由数据将不会发送到动画系统")
@@ -243,37 +318,30 @@ class SRv6RouteServer:
             # 直接使用传入的animation_conn作为类变量
             # 这是visualied_celestial.py中创建的parent_conn
             SRv6RouteServer.animation_conn_instance = animation_conn
-                        
-            # 测试连接
-            try:
-                logger.info("开始测试连接...")
-                
-                # 第一次测试消息
-                test_msg = {"type": "srv6_route_test", "message": "测试SRv6路由服务器连接", "timestamp": time.time()}
-                logger.info(f"发送第一次测试消息: {test_msg}")
-                animation_conn.send(test_msg)
-                logger.info("成功发送第一次测试消息到动画进程")
-                
-                # 等待响应处理
-                time.sleep(0.5)  # 等待时间
-                
-                # 第二次测试消息
-                test_msg = {"type": "srv6_route_test", "message": "测试SRv6路由服务器连接 - 确认", "timestamp": time.time()}
-                logger.info(f"发送第二次测试消息: {test_msg}")
-                animation_conn.send(test_msg)
-                logger.info("成功发送第二次测试消息到动画进程")
-                
-                # 再次等待响应处理
-                time.sleep(0.5)  # 等待时间
-                
-            except Exception as e:
-                logger.error(f"测试发送消息到动画进程失败: {e}")
-                import traceback
-                logger.error(traceback.format_exc())
         else:
             logger.error(f"提供的animation_conn对象无效，类型: {type(animation_conn)}")
             SRv6RouteServer.animation_conn_instance = None
     
+    @staticmethod
+    def build_addr_index(shell_sats: List[int], gst_num: int = 0) -> None:
+        """构建节点IPv6地址到(shell, id)的索引
+
+        地址格式为fd00::a:shell:b3:b4，与ipaddress规范化后的形式一致（小写、无前导零），
+        卫星的shell标识从1开始，地面站的shell标识为0
+
+        :param shell_sats: 每个shell的卫星数
+        :param gst_num: 地面站数量
+        """
+        index: Dict[str, tuple] = {}
+        counts = [(0, gst_num)] + [(s + 1, n) for s, n in enumerate(shell_sats)]
+        for shell, n in counts:
+            for node_id in range(n):
+                b3 = (node_id >> 6) & 0xFF
+                b4 = ((node_id << 2) & 0xFF) + 2
+                index[f"fd00::a:{shell:x}:{b3:x}:{b4:x}"] = (shell, node_id)
+        SRv6RouteServer.addr_index = index
+        logger.info(f"已构建地址索引，共{len(index)}个节点地址")
+
     def start(self):
         """启动服务器"""
         if self.running:
@@ -281,10 +349,14 @@ class SRv6RouteServer:
             return
         
         try:
-            self.server = HTTPServer((self.host, self.port), SRv6RouteHandler)
+            # 每个请求在独立线程中处理，突发的路由请求不会相互阻塞
+            self.server = ThreadingHTTPServer((self.host, self.port), SRv6RouteHandler)
             self.server_thread = threading.Thread(target=self.server.serve_forever)
             self.server_thread.daemon = True
             self.server_thread.start()
+            self.batch_thread = threading.Thread(target=self._drain_route_queue)
+            self.batch_thread.daemon = True
+            self.batch_thread.start()
             self.running = True
             logger.info(f"SRv6路由服务器已启动: http://{self.host}:{self.port}")
         except Exception as e:
@@ -297,7 +369,8 @@ class SRv6RouteServer:
             return
         
         try:
-            # 清除animation_conn_instance引用
+            # 通知批量发送线程退出，并清除animation_conn_instance引用
+            SRv6RouteServer.route_queue.put(None)
             SRv6RouteServer.animation_conn_instance = None
             
             # 关闭HTTP服务器
@@ -310,7 +383,50 @@ class SRv6RouteServer:
             import traceback
             logger.error(traceback.format_exc())
 
-    # 不再需要消息转发方法，直接使用visualized_celestial.py中创建的parent_conn
+    def _drain_route_queue(self):
+        """批量发送线程：合并队列中的路由消息，作为一条srv6_batch消息发送到动画进程
+
+        每批从第一条消息开始收集，最多BATCH_MAX_MESSAGES条或BATCH_MAX_DELAY秒，
+        从而将序列化和管道写入的开销分摊到多条路由上；收到None时退出
+        """
+        route_queue = SRv6RouteServer.route_queue
+        probed = False
+        while True:
+            msg = route_queue.get()
+            if msg is None:
+                return
+
+            msgs = [msg]
+            stop = False
+            deadline = time.monotonic() + self.BATCH_MAX_DELAY
+            while len(msgs) < self.BATCH_MAX_MESSAGES:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    msg = route_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if msg is None:
+                    stop = True
+                    break
+                msgs.append(msg)
+
+            animation_conn = SRv6RouteServer.animation_conn_instance
+            if animation_conn is not None:
+                try:
+                    with SRv6RouteServer.send_lock:
+                        if not probed:
+                            # 在第一批路由之前发送一次连接测试消息；动画进程不回复测试消息，
+                            # 且该管道的接收端由星座对象读取，因此这里不等待应答
+                            animation_conn.send({"type": "srv6_route_test", "message": "测试SRv6路由服务器连接", "timestamp": time.time()})
+                            probed = True
+                        animation_conn.send({"type": "srv6_batch", "messages": msgs})
+                except Exception as e:
+                    logger.error(f"批量发送路由数据到动画进程失败: {e}")
+
+            if stop:
+                return
 
 # 测试代码
 if __name__ == "__main__":
@@ -1,6 +1,12 @@
-import json
-import subprocess
+import functools
+import requests  # type: ignore
+from pyroute2 import IPRoute  # type: ignore
 
+# 复用同一个会话（连接池、keep-alive），避免每次查询都启动 curl 进程
+session = requests.Session()
+
+# 地址只取决于 shell 和 satellite id，路径中重复出现的节点直接复用结果
+@functools.lru_cache(maxsize=None)
 def calculate_ips(shell_id, satellite_id):
     # 计算 IPv4 地址
     byte1 = 10  # 固定为10
@@ -18,13 +24,9 @@ def calculate_ips(shell_id, satellite_id):
 
 def execute_command():
     try:
-        # 执行 curl 命令并获取 JSON 输出
-        result = subprocess.run(
-            ["curl", "info.celestial/path/gst/validator/1/1040"],
-            capture_output=True,
-            text=True
-        )
-        json_data = json.loads(result.stdout)
+        # 通过复用的 HTTP 会话获取路径的 JSON 数据
+        response = session.get("http://info.celestial/path/gst/validator/1/1040", timeout=2)
+        json_data = response.json()
         
         # 提取 segments
         segments = json_data.get("segments", [])
@@ -56,19 +58,19 @@ def execute_command():
         # 目标地址为最后一个 segment 的 target
         final_target_ip = ipv6_segs[-1]
         # 中间节点的 IPv6 地址，排除第一个和最后一个地址
-        ipv6_segs_str = ",".join(ipv6_segs[1:-1])
-        
-        # 格式化 ip route 命令
-        ip_route_cmd = f"ip -6 route add {final_target_ip} encap seg6 mode encap segs {ipv6_segs_str} dev eth0"
-        print("Generated IP Route Command:")
-        print(ip_route_cmd)
+        segs = ipv6_segs[1:-1]
+        print(f"Adding SRv6 route: {final_target_ip} encap seg6 mode encap segs {','.join(segs)} dev eth0")
         
-        # 执行 ip route 命令
-        route_result = subprocess.run(ip_route_cmd, shell=True, text=True)
-        if route_result.returncode == 0:
-            print("Route command executed successfully.")
-        else:
-            print("Error executing route command:", route_result.stderr)
+        # 通过 netlink 直接添加路由，无需启动 ip 进程并经过 shell 解析命令
+        with IPRoute() as ipr:
+            idx = ipr.link_lookup(ifname="eth0")[0]
+            ipr.route(
+                "add",
+                dst=final_target_ip,
+                oif=idx,
+                encap={"type": "seg6", "mode": "encap", "segs": segs},
+            )
+        print("Route added successfully.")
 
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -1,14 +1,23 @@
 import sys
 import json
+import logging
+import atexit
 import time
+import queue
 import socket
+import ctypes
 import threading
-import subprocess
 import ipaddress
+import functools
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 import httpx
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Set, Tuple
 from dataclasses import dataclass
 from bcc import BPF
+from readerwriterlock.rwlock import RWLockFair  # type: ignore
+from pyroute2 import IPRoute  # type: ignore
+from pyroute2.netlink.exceptions import NetlinkError  # type: ignore
 
 # --------------------------
 # 配置参数
@@ -19,65 +28,164 @@ CONFIG = {
     "route_ttl": 15,          # 路由有效期（秒）
     "update_interval": 5,     # 路由更新间隔（秒）
     "seg6_mtu": 1500,        # 设置SRv6路由的mtu值
+    "resolve_workers": 8,     # 并发路径解析线程数
+    "visual_batch_window": 0.2,  # 可视化更新合并窗口（秒）
     "visual_api": "http://192.168.3.46:8080/api/route"  # 可视化系统API地址
 }
 
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("SRv6RouteManager")
+
 # --------------------------
 # 数据结构
 # --------------------------
-@dataclass
+@dataclass(frozen=True)
 class NodeID:
     shell: int      # 地面站时shell为0
     id: int
 
+# --------------------------
+# 地址解析（结果按地址缓存）
+# --------------------------
+# 节点地址fd00::a:shell:c:d的固定部分，计算时只改写可变字节
+_IPV6_TEMPLATE = bytes.fromhex("fd00" + "0000" * 3 + "000a" + "0000" * 3)
+
+@functools.lru_cache(maxsize=65536)
+def _calculate_ip_packed(shell: int, node_id: int) -> bytes:
+    """计算节点IPv6地址的16字节形式"""
+    buf = bytearray(_IPV6_TEMPLATE)
+    buf[11] = shell                          # shell 标识符
+    buf[13] = (node_id >> 6) & 0xFF          # 卫星标识符，右移6位
+    buf[15] = ((node_id << 2) & 0xFF) + 2    # 卫星标识符，左移2位
+    return bytes(buf)
+
+@functools.lru_cache(maxsize=4096)
+def _ip_to_node_id_cached(ipv6: str) -> NodeID:
+    """将FD00开头的IPv6地址解析为节点信息（按地址缓存）"""
+    try:
+        parts = ipv6.split(":")[-4:]
+        
+        # 提取关键字段并转换为整数
+        b = int(parts[1], 16)
+        c = int(parts[2], 16)
+        d = int(parts[3], 16)
+    
+        return NodeID(b,(c<<6)|((d-2)>>2))
+    except Exception as e:
+        logger.warning("解析错误: %s", e)
+        return NodeID(-1, -1)
+
+@functools.lru_cache(maxsize=4096)
+def _path_url_cached(src_shell: int, src_id: int, dest_ip: str) -> str:
+    """构造路径查询URL（按源节点与目标地址缓存）"""
+    target = _ip_to_node_id_cached(dest_ip)
+    
+    # 构造源路径段
+    src_part = f"{src_shell}/{src_id}"
+    
+    # 构造目标路径段
+    dest_part =  f"{target.shell}/{target.id}"
+    
+    return f"/path/{src_part}/{dest_part}"
+
 # --------------------------
 # 核心功能实现
 # --------------------------
 class SRv6DynamicRouter:
     def __init__(self):
-        self.lock = threading.Lock()
-        self.http = httpx.Client(base_url=CONFIG["api_base"], timeout=30)
+        # 路由表读写锁：事件处理只读并行，安装/删除路由时独占
+        self.lock = RWLockFair()
+        # 路径查询连接池，解析线程并发请求时各自复用长连接
+        self.http = httpx.Client(
+            base_url=CONFIG["api_base"],
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        )
+        # 可视化系统长连接（复用TCP连接，避免每次发送重新握手）
+        self.visual_http = httpx.Client(
+            timeout=3,  # 短超时，避免影响主要功能
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16)
+        )
+        self._closed = False
+        # 可视化更新队列，由后台线程合并后发送
+        self.visual_q: "queue.Queue[Tuple[str, dict]]" = queue.Queue(maxsize=1024)
         self.node_info = self._get_self_info()
-        self.self_ipv6=ipaddress.IPv6Address(self._calculate_ip(self.node_info.shell,self.node_info.id))
+        self.self_ipv6=ipaddress.IPv6Address(_calculate_ip_packed(self.node_info.shell,self.node_info.id))
         self.n_ipv6=self.self_ipv6-1
+        # 事件过滤直接比较打包后的16字节地址
+        self._self_packed = self.self_ipv6.packed
+        self._n_packed = self.n_ipv6.packed
         self.active_routes: Dict[str, dict] = {}
-
-        # 新增线程管理变量
-        self.update_threads = {}  # 格式: { dest_ip: threading.Thread }
-        self.thread_lock = threading.Lock()  # 线程操作专用锁
+        # 下一跳 -> 经由该下一跳的目标地址集合，与active_routes同步维护
+        self.next_hop_index: Dict[str, Set[str]] = {}
+        # 正在解析路径的目标地址，避免同一目标重复请求
+        self.resolving: Set[str] = set()
+        self.resolving_lock = threading.Lock()
+        # 路径解析线程池，HTTP请求不占用事件循环线程
+        self.resolver = ThreadPoolExecutor(max_workers=CONFIG["resolve_workers"])
+
+        # netlink连接，直接下发路由而无需启动ip进程
+        self.ipr = IPRoute()
+        self.ifindex = self.ipr.link_lookup(ifname=CONFIG["interface"])[0]
+        # close()用到的资源均已创建，此时再注册退出清理
+        atexit.register(self.close)
+
+        # 路由更新调度：最小堆 (下次更新时间, dest_ip)，由单个调度线程消费
+        self._update_heap: List[Tuple[float, str]] = []
+        self._update_cv = threading.Condition()
+        self._scheduled: Set[str] = set()  # 已在堆中的目标，避免重复调度
         
         # 初始化eBPF监控
         self.bpf = BPF(text=self._load_ebpf_program())
+        self.known_routes = self.bpf["known_routes"]
+        self.kernel_last_used = self.bpf["last_used"]
+        self_addr = self.bpf["self_addr"]
+        self_addr[ctypes.c_int(0)] = self_addr.Leaf.from_buffer_copy(self.self_ipv6.packed)
         fn = self.bpf.load_func("trace_ipv6_out", BPF.SOCKET_FILTER)
         self.bpf.attach_raw_socket(fn, CONFIG["interface"])
-        self.bpf["route_events"].open_perf_buffer(self.handle_event)
+        self.bpf["route_events"].open_ring_buffer(self.handle_event)
         
         # 启动后台线程
         threading.Thread(target=self._event_loop, daemon=True).start()
         threading.Thread(target=self._cleanup_loop, daemon=True).start()
+        threading.Thread(target=self._update_loop, daemon=True).start()
+        threading.Thread(target=self._visual_loop, daemon=True).start()
         
         # 检查可视化系统连接
         self._check_visual_system()
         
-        print(f"✅ 路由器初始化完成，监控接口: {CONFIG['interface']}")
+        logger.info("✅ 路由器初始化完成，监控接口: %s", CONFIG['interface'])
         
     def _check_visual_system(self):
         """检查可视化系统连接状态"""
         if "visual_api" in CONFIG and CONFIG["visual_api"]:
             try:
                 # 发送测试请求到可视化系统
-                resp = httpx.get(
-                    CONFIG["visual_api"].rsplit('/', 1)[0] + "/status",  # 假设有状态检查接口
-                    timeout=3
+                resp = self.visual_http.get(
+                    CONFIG["visual_api"].rsplit('/', 1)[0] + "/status"  # 假设有状态检查接口
                 )
                 if resp.status_code == 200:
-                    print(f"✅ 可视化系统连接成功: {CONFIG['visual_api']}")
+                    logger.info("✅ 可视化系统连接成功: %s", CONFIG['visual_api'])
                 else:
-                    print(f"⚠️ 可视化系统响应异常: {resp.status_code}")
+                    logger.warning("⚠️ 可视化系统响应异常: %s", resp.status_code)
             except Exception as e:
-                print(f"⚠️ 可视化系统连接失败: {str(e)}，路由更新将不会发送到可视化系统")
+                logger.warning("⚠️ 可视化系统连接失败: %s，路由更新将不会发送到可视化系统", e)
         else:
-            print("ℹ️ 未配置可视化系统，路由更新将不会发送到可视化系统")
+            logger.info("ℹ️ 未配置可视化系统，路由更新将不会发送到可视化系统")
+
+    def close(self):
+        """关闭解析线程池、HTTP连接池和netlink连接，可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        resolver = getattr(self, "resolver", None)
+        if resolver is not None:
+            resolver.shutdown(wait=False)
+        self.visual_http.close()
+        self.http.close()
+        ipr = getattr(self, "ipr", None)
+        if ipr is not None:
+            ipr.close()
 
     def _load_ebpf_program(self) -> str:
         """去除非必要调试函数后的安全版本"""
@@ -92,8 +200,19 @@ class SRv6DynamicRouter:
             u8 daddr[16];
             u8 saddr[16];
         };
+
+        struct addr_key {
+            u8 addr[16];
+        };
         
-        BPF_PERF_OUTPUT(route_events);
+        // 所有CPU共享的环形缓冲区（16页）
+        BPF_RINGBUF_OUTPUT(route_events, 16);
+        // 已知路由的目标与下一跳 -> 加入时间（ns），由用户态维护
+        BPF_HASH(known_routes, struct addr_key, u64, 4096);
+        // 已知地址 -> 最近一次发包时间（ns），由内核更新、用户态清理时读取
+        BPF_TABLE("lru_hash", struct addr_key, u64, last_used, 16384);
+        // 本机IPv6地址，由用户态写入
+        BPF_ARRAY(self_addr, struct addr_key, 1);
         
         int trace_ipv6_out(struct __sk_buff *skb) {
             // 基础以太网头解析
@@ -121,12 +240,31 @@ class SRv6DynamicRouter:
                 ip6.daddr.in6_u.u6_addr8[1] != 0x00) {
                 return 0;
             }
+
+            // 仅处理本机发出的流量
+            int zero = 0;
+            struct addr_key *self = self_addr.lookup(&zero);
+            if (!self || __builtin_memcmp(ip6.saddr.in6_u.u6_addr8, self->addr, 16) != 0) {
+                return 0;
+            }
+
+            // 已知地址只在内核中记录使用时间，不再上报
+            struct addr_key key = {};
+            __builtin_memcpy(key.addr, ip6.daddr.in6_u.u6_addr8, 16);
+            if (known_routes.lookup(&key)) {
+                u64 now = bpf_ktime_get_ns();
+                last_used.update(&key, &now);
+                return 0;
+            }
             
-            // 提交事件
-            struct route_event evt = {};
-            __builtin_memcpy(evt.saddr, ip6.saddr.in6_u.u6_addr8, 16);  // 新增此行
-            __builtin_memcpy(evt.daddr, ip6.daddr.in6_u.u6_addr8, 16);
-            route_events.perf_submit(skb, &evt, sizeof(evt));
+            // 提交事件（缓冲区已满时丢弃）
+            struct route_event *evt = route_events.ringbuf_reserve(sizeof(struct route_event));
+            if (!evt) {
+                return 0;
+            }
+            __builtin_memcpy(evt->saddr, ip6.saddr.in6_u.u6_addr8, 16);
+            __builtin_memcpy(evt->daddr, ip6.daddr.in6_u.u6_addr8, 16);
+            route_events.ringbuf_submit(evt, 0);
             return 0;
         }
         """
@@ -144,36 +282,17 @@ class SRv6DynamicRouter:
                     id=data["identifier"]["id"]
                 )
             except Exception as e:
-                print(f"⚠️ 获取节点信息失败: {str(e)}，1秒后重试...")
+                logger.warning("⚠️ 获取节点信息失败: %s，1秒后重试...", e)
                 time.sleep(1)
         raise RuntimeError("❌ 无法获取本机节点信息")
 
     def _build_path_url(self, dest_ip: str) -> str:
         """构造路径查询URL"""
-        target = self._ip_to_node_id(dest_ip)
-        
-        # 构造源路径段
-        src_part = f"{self.node_info.shell}/{self.node_info.id}"
-        
-        # 构造目标路径段
-        dest_part =  f"{target.shell}/{target.id}"
-        
-        return f"/path/{src_part}/{dest_part}"
+        return _path_url_cached(self.node_info.shell, self.node_info.id, dest_ip)
 
     def _ip_to_node_id(self, ipv6: str) -> NodeID:
         """将FD00开头的IPv6地址解析为节点信息"""
-        try:
-            parts = ipv6.split(":")[-4:]
-            
-            # 提取关键字段并转换为整数
-            b = int(parts[1], 16)
-            c = int(parts[2], 16)
-            d = int(parts[3], 16)
-        
-            return NodeID(b,(c<<6)|((d-2)>>2))
-        except Exception as e:
-            print(f"解析错误: {str(e)}")
-            return NodeID(-1, -1)
+        return _ip_to_node_id_cached(ipv6)
     
     def _process_path(self, json_data: dict) -> Tuple[Optional[str], List[str]]:
         """路径处理（严格过滤无效节点）"""
@@ -182,130 +301,109 @@ class SRv6DynamicRouter:
             if len(segments) < 1:
                 raise ValueError("路径段为空")
 
-            intermediate_nodes = []
-            # 严格处理中间节点
-            for seg in segments[:-1]:  # 排除最后一段
-                target = seg.get("target", {})
-                tgt_shell = target.get("shell", 0)
-                tgt_id = target.get("id", 0)
+            # 一次取出全部节点参数（含最终目标）
+            targets = [
+                (target.get("shell", 0), target.get("id", 0))
+                for target in (seg.get("target", {}) for seg in segments)
+            ]
 
-                # 参数有效性验证
+            # 参数有效性验证
+            for tgt_shell, tgt_id in targets:
                 if not (0 <= tgt_shell <= 255 and 0 <= tgt_id <= 0xFFFF):
                     raise ValueError(f"无效节点参数 shell={tgt_shell} id={tgt_id}")
 
-                # 生成并验证IPv6地址
-                ipv6 = self._calculate_ip(tgt_shell, tgt_id)
-                try:
-                    ipaddress.IPv6Address(ipv6)
-                    intermediate_nodes.append(ipv6)
-                except ipaddress.AddressValueError:
-                    raise ValueError(f"生成无效中间节点地址: {ipv6}")
-            print(f"🔄 生成中间节点列表: {intermediate_nodes}")
-            return self._get_final_ip(segments[-1]), intermediate_nodes
+            # 参数在范围内时_calculate_ip生成的地址必然合法，无需再解析验证
+            calculate_ip = self._calculate_ip
+            nodes = [calculate_ip(tgt_shell, tgt_id) for tgt_shell, tgt_id in targets]
+            intermediate_nodes = nodes[:-1]  # 排除最后一段
+            logger.debug("🔄 生成中间节点列表: %s", intermediate_nodes)
+            return nodes[-1], intermediate_nodes
         except Exception as e:
-            print(f"❌ 路径处理失败: {str(e)}")
+            logger.error("❌ 路径处理失败: %s", e)
             return None, []
 
-    def _get_final_ip(self, segment: dict) -> str:
-        """处理最终目标节点"""
-        target = segment.get("target", {})
-
-        shell = target.get("shell", 0)
-        node_id = target.get("id", 0)
-    
-        final_ip = self._calculate_ip(shell, node_id)
-        try:
-            ipaddress.IPv6Address(final_ip)
-            return final_ip
-        except ipaddress.AddressValueError:
-            raise ValueError(f"最终目标地址无效: {final_ip}")
-
     @staticmethod
+    @functools.lru_cache(maxsize=65536)
     def _calculate_ip(shell: int, node_id: int) -> str:
         """
-        根据 shell_id 和 satellite_id 计算 IPv4 和 IPv6 地址。
+        根据 shell_id 和 satellite_id 计算 IPv6 地址（文本形式，用于路由表与netlink）。
         """
-        byte1 = 10  # 固定为10
-        byte2 = shell  # shell 标识符
-        byte3 = (node_id >> 6) & 0xFF  # 卫星标识符，右移6位
-        byte4 = (node_id << 2) & 0xFF  # 卫星标识符，左移2位
+        return socket.inet_ntop(socket.AF_INET6, _calculate_ip_packed(shell, node_id))
 
-        # 计算 IPv6 地址
-        ipv6_address = f"fd00::{byte1:x}:{byte2:x}:{byte3:x}:{(byte4 + 2):x}"
+    def _route_manager(self, dest_ip: str):
+        """路由管理（新增空节点判断）
 
-        return ipv6_address
+        调用方需先将dest_ip加入self.resolving，HTTP请求期间不持有锁
+        """
+        try:
+            path_url = self._build_path_url(dest_ip)
+            logger.debug("🌐 正在请求API路径: %s", path_url)
 
-    def _route_manager(self, dest_ip: str):
-        """路由管理（新增空节点判断）"""
-        with self.lock:
-            try:
-                path_url = self._build_path_url(dest_ip)
-                print(f"🌐 正在请求API路径: {path_url}")
+            resp = self.http.get(path_url, timeout=5)
+            resp.raise_for_status()
+            
+            # 获取原始路径数据用于可视化
+            path_data = resp.json()
+            
+            final_ip, segments = self._process_path(path_data)
+            if not final_ip:
+                return
 
-                resp = self.http.get(path_url, timeout=5)
-                resp.raise_for_status()
-                
-                # 获取原始路径数据用于可视化
-                path_data = resp.json()
-                
-                final_ip, segments = self._process_path(path_data)
-                if not final_ip:
-                    return
-
-                # 关键修改：无中间节点时删除路由
-                if not segments:
-                    print(f"🔄 路径无中间节点，清理路由: {final_ip}")
-                    if final_ip in self.active_routes:
-                        self._remove_route(final_ip)
-                        del self.active_routes[final_ip]
-                    return
-
-                # 路由安装/更新逻辑
-                if final_ip in self.active_routes:
-                    if segments != self.active_routes[final_ip]["segments"]:
-                        self._install_route(final_ip, segments)
-                        # 发送路由信息到可视化系统
-                        self._send_route_to_visual(dest_ip, final_ip, segments, path_data)
-                    else:
-                        self.active_routes[final_ip]["last_used"] = time.time()
-                else:
-                    self._install_route(final_ip, segments)
-                    # 发送路由信息到可视化系统
-                    self._send_route_to_visual(dest_ip, final_ip, segments, path_data)
-                
-            except httpx.HTTPStatusError as e:
-                print(f"❌ API错误: {e.response.status_code}")
-            except Exception as e:
-                print(f"❌ 路由管理失败: {str(e)}")
+            # 路径未变化时_apply_path只刷新last_used，不会调用netlink
+            with self.lock.gen_wlock():
+                self._apply_path(dest_ip, final_ip, segments, path_data)
+            
+        except httpx.HTTPStatusError as e:
+            logger.error("❌ API错误: %s", e.response.status_code)
+        except Exception as e:
+            logger.error("❌ 路由管理失败: %s", e)
+        finally:
+            with self.resolving_lock:
+                self.resolving.discard(dest_ip)
+
+    def _apply_path(self, dest_ip: str, final_ip: str, segments: List[str], path_data: dict):
+        """按解析结果安装、更新或删除路由，调用方需持有写锁"""
+        # 关键修改：无中间节点时删除路由
+        if not segments:
+            logger.debug("🔄 路径无中间节点，清理路由: %s", final_ip)
+            if final_ip in self.active_routes:
+                self._remove_route(final_ip)
+                del self.active_routes[final_ip]
+            return
+
+        # 路径未变化（或已被其他线程更新为相同路径）时只刷新last_used
+        info = self.active_routes.get(final_ip)
+        if info is not None and info["segments"] == segments:
+            info["last_used"] = time.time()
+            return
+
+        self._install_route(final_ip, segments)
+        # 发送路由信息到可视化系统
+        self._send_route_to_visual(dest_ip, final_ip, segments, path_data)
 
     def _install_route(self, dest_ip: str, segments: List[str]):
         """路由安装（严格单线程控制）"""
         if not segments:
-            print(f"⏭️ 空节点列表，跳过路由安装: {dest_ip}")
+            logger.debug("⏭️ 空节点列表，跳过路由安装: %s", dest_ip)
             return
             
         try:
-            # 构造动态参数命令
-            cmd = [
-                "ip", "-6", "route", "replace", dest_ip,
-                "encap", "seg6", "mode", "encap",
-                "segs", ",".join(segments),
-                "dev", CONFIG["interface"], "mtu", str(CONFIG["seg6_mtu"])
-            ]
-        
-            print(f"🛠️ 执行路由更新: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-        
-            if result.returncode != 0:
-                raise subprocess.CalledProcessError(
-                    result.returncode, cmd,
-                    output=result.stdout, stderr=result.stderr
-                )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🛠️ 执行路由更新: %s encap seg6 mode encap segs %s dev %s", dest_ip, ','.join(segments), CONFIG['interface'])
+            self.ipr.route(
+                "replace",
+                family=socket.AF_INET6,
+                dst=dest_ip,
+                oif=self.ifindex,
+                encap={"type": "seg6", "mode": "encap", "segs": segments},
+                metrics={"mtu": CONFIG["seg6_mtu"]}
+            )
             
-            print(f"✅ 路由更新成功: {dest_ip}")
+            logger.info("✅ 路由更新成功: %s", dest_ip)
             
             # 关键修改：在写入路由前判断是否为新路由
-            is_new_route = dest_ip not in self.active_routes
+            old_info = self.active_routes.get(dest_ip)
+            is_new_route = old_info is None
             
             # 更新路由信息
             self.active_routes[dest_ip] = {
@@ -315,51 +413,69 @@ class SRv6DynamicRouter:
                 "update_time": time.time()
             }
 
+            # 同步下一跳索引与内核中的已知地址
+            self._mark_known(dest_ip)
+            self._mark_known(segments[0])
+            if old_info is None or old_info["next_hop"] != segments[0]:
+                self.next_hop_index.setdefault(segments[0], set()).add(dest_ip)
+                if old_info:
+                    self._unindex_next_hop(old_info["next_hop"], dest_ip)
+                    self._release_known(old_info["next_hop"], dest_ip)
+
             if is_new_route:
                 self._schedule_updater(dest_ip)
                 
-        except subprocess.CalledProcessError as e:
-            print(f"❌ 命令执行失败: {e.stderr.strip()}")
+        except NetlinkError as e:
+            logger.error("❌ 路由下发失败: %s", e)
         except Exception as e:
-            print(f"❌ 路由安装异常: {str(e)}")
+            logger.error("❌ 路由安装异常: %s", e)
 
     def _schedule_updater(self, dest_ip: str):
-        """路由更新调度（严格线程去重）"""
-        with self.thread_lock:
-            # 检查是否已有存活线程
-            existing_thread = self.update_threads.get(dest_ip)
-            if existing_thread and existing_thread.is_alive():
-                print(f"⏩ 已有更新线程运行: {dest_ip}")
+        """路由更新调度（同一目标只保留一个调度项）"""
+        with self._update_cv:
+            if dest_ip in self._scheduled:
+                logger.debug("⏩ 已在更新调度中: %s", dest_ip)
                 return
+            self._scheduled.add(dest_ip)
+            heapq.heappush(self._update_heap, (time.time() + CONFIG["update_interval"], dest_ip))
+            self._update_cv.notify()
 
-        print(f"🕒 启动路由更新守护线程: {dest_ip}")
-        
-        def update_job():
-            while True:
-                # 检查路由是否仍然存在
-                with self.lock:
-                    if dest_ip not in self.active_routes:
+        logger.debug("🕒 加入路由更新调度: %s", dest_ip)
+
+    def _update_loop(self):
+        """更新调度循环：取出到期的目标交由线程池更新"""
+        while True:
+            with self._update_cv:
+                while True:
+                    if not self._update_heap:
+                        self._update_cv.wait()
+                        continue
+                    delay = self._update_heap[0][0] - time.time()
+                    if delay <= 0:
                         break
-                
-                # 执行更新
-                try:
-                    time.sleep(CONFIG["update_interval"])
-                    self._update_route(dest_ip)
-                except Exception as e:
-                    print(f"⚠️ 更新线程异常: {str(e)}")
+                    self._update_cv.wait(delay)
+                _, dest_ip = heapq.heappop(self._update_heap)
 
-            # 线程退出时清理
-            with self.thread_lock:
-                if dest_ip in self.update_threads:
-                    del self.update_threads[dest_ip]
-            print(f"⏹️ 更新线程退出: {dest_ip}")
+            # 路由已被清理时移出调度（加锁顺序与_install_route一致：先self.lock后_update_cv）
+            with self.lock.gen_rlock():
+                if dest_ip not in self.active_routes:
+                    with self._update_cv:
+                        self._scheduled.discard(dest_ip)
+                    logger.debug("⏹️ 路由更新结束: %s", dest_ip)
+                    continue
 
-        # 创建并记录线程
-        thread = threading.Thread(target=update_job, daemon=True)
-        thread.start()
-        
-        with self.thread_lock:
-            self.update_threads[dest_ip] = thread
+            self.resolver.submit(self._update_job, dest_ip)
+
+    def _update_job(self, dest_ip: str):
+        """执行一次路由更新并重新调度"""
+        try:
+            self._update_route(dest_ip)
+        except Exception as e:
+            logger.warning("⚠️ 更新任务异常: %s", e)
+
+        with self._update_cv:
+            heapq.heappush(self._update_heap, (time.time() + CONFIG["update_interval"], dest_ip))
+            self._update_cv.notify()
 
     def _send_route_to_visual(self, dest_ip: str, final_ip: str, segments: List[str], path_data: dict):
         """向可视化系统发送路由信息（完整版）
@@ -383,147 +499,221 @@ class SRv6DynamicRouter:
                 }
             }
             
-            # 发送数据到可视化系统
+            # 交由后台线程发送，不阻塞路由处理
             try:
-                resp = httpx.post(
-                    CONFIG["visual_api"], 
-                    json=visual_data,
-                    timeout=3  # 短超时，避免影响主要功能
-                )
-                if resp.status_code == 200:
-                    print(f"✅ 完整路由信息已发送到可视化系统: {dest_ip}")
-                else:
-                    print(f"⚠️ 可视化系统响应异常: {resp.status_code}")
-            except Exception as e:
-                print(f"⚠️ 发送路由信息到可视化系统失败: {str(e)}")
-                
+                self.visual_q.put_nowait((dest_ip, visual_data))
+            except queue.Full:
+                logger.warning("⚠️ 可视化队列已满，丢弃路由更新: %s", dest_ip)
+
             # 打印路由信息，便于调试
-            print(f"📊 路由详情: 源={self.self_ipv6}, 目标={final_ip}")
-            print(f"📍 节点信息: shell={self.node_info.shell}, id={self.node_info.id}")
-            print(f"🔄 中间节点数量: {len(segments)}")
+            logger.debug("📊 路由详情: 源=%s, 目标=%s", self.self_ipv6, final_ip)
+            logger.debug("📍 节点信息: shell=%s, id=%s", self.node_info.shell, self.node_info.id)
+            logger.debug("🔄 中间节点数量: %s", len(segments))
         except Exception as e:
-            print(f"⚠️ 准备路由可视化数据失败: {str(e)}")
+            logger.warning("⚠️ 准备路由可视化数据失败: %s", e)
             # 错误不影响主要功能
             
+    def _visual_loop(self):
+        """可视化发送循环（合并窗口内同一目标的多次更新）"""
+        while True:
+            dest_ip, visual_data = self.visual_q.get()
+            pending = {dest_ip: visual_data}
+
+            # 收集窗口内的后续更新，同一目标只保留最新一条
+            deadline = time.monotonic() + CONFIG["visual_batch_window"]
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    dest_ip, visual_data = self.visual_q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending[dest_ip] = visual_data
+
+            for dest_ip, visual_data in pending.items():
+                try:
+                    resp = self.visual_http.post(CONFIG["visual_api"], json=visual_data)
+                    if resp.status_code == 200:
+                        logger.info("✅ 完整路由信息已发送到可视化系统: %s", dest_ip)
+                    else:
+                        logger.warning("⚠️ 可视化系统响应异常: %s", resp.status_code)
+                except Exception as e:
+                    logger.warning("⚠️ 发送路由信息到可视化系统失败: %s", e)
+
     def _update_route(self, dest_ip: str):
         """路由更新实现"""
         for _ in range(3):
             try:
-                with self.lock:
+                with self.lock.gen_rlock():
                     if dest_ip not in self.active_routes:
                         return
-                    
-                    print(f"🔄 更新路由: {dest_ip}")
-                    path_url = self._build_path_url(dest_ip)
-                    resp = self.http.get(path_url, timeout=5)
-                    resp.raise_for_status()
-                    
-                    # 获取原始路径数据
-                    path_data = resp.json()
-                    final_ip, new_segments = self._process_path(path_data)
-                    
-                    if new_segments != self.active_routes[dest_ip]["segments"]:
-                        self._install_route(final_ip, new_segments)
-                        # 路由变化时发送到可视化系统
-                        self._send_route_to_visual(dest_ip, final_ip, new_segments, path_data)
+                
+                # HTTP请求期间不持有锁
+                logger.debug("🔄 更新路由: %s", dest_ip)
+                path_url = self._build_path_url(dest_ip)
+                resp = self.http.get(path_url, timeout=5)
+                resp.raise_for_status()
+                
+                # 获取原始路径数据
+                path_data = resp.json()
+                final_ip, new_segments = self._process_path(path_data)
+                if not final_ip:
+                    raise ValueError("路径解析结果无效")
+
+                with self.lock.gen_wlock():
+                    # 请求期间路由可能已被清理
+                    info = self.active_routes.get(dest_ip)
+                    if info is None:
+                        return
+
+                    # 路由无变化时只记录更新时间，变化时安装并发送到可视化系统
+                    if new_segments == info["segments"]:
+                        logger.debug("ℹ️ 路由无变化")
                     else:
-                        print("ℹ️ 路由无变化")
+                        self._apply_path(dest_ip, final_ip, new_segments, path_data)
                     
-                    self.active_routes[dest_ip]["update_time"] = time.time()
+                    if dest_ip in self.active_routes:
+                        self.active_routes[dest_ip]["update_time"] = time.time()
                 break
             except Exception as e:
-                print(f"⚠️ 路由更新失败: {str(e)}")
+                logger.warning("⚠️ 路由更新失败: %s", e)
                 time.sleep(1)
 
     def _cleanup_loop(self):
-        """路由清理循环（增加线程清理）"""
+        """路由清理循环"""
         while True:
             time.sleep(CONFIG["route_ttl"] // 2)
             try:
-                with self.lock:
-                    # 清理过期路由
+                with self.lock.gen_wlock():
+                    # 清理过期路由（空闲时间取用户态与内核记录中较新的一个）
                     current_time = time.time()
+                    kernel_idle = self._kernel_idle_times()
                     expired = [
                         ip for ip, info in self.active_routes.items()
-                        if current_time - info["last_used"] > CONFIG["route_ttl"]
+                        if min(
+                            current_time - info["last_used"],
+                            kernel_idle.get(ip, float("inf")),
+                            kernel_idle.get(info["next_hop"], float("inf"))
+                        ) > CONFIG["route_ttl"]
                     ]
                     
                     for ip in expired:
                         self._remove_route(ip)
                         del self.active_routes[ip]
-
-                # 清理无效线程记录
-                with self.thread_lock:
-                    active_routes = set(self.active_routes.keys())
-                    dead_ips = [ip for ip in self.update_threads if ip not in active_routes]
-                    for ip in dead_ips:
-                        del self.update_threads[ip]
                         
             except Exception as e:
-                print(f"⚠️ 清理异常: {str(e)}")
+                logger.warning("⚠️ 清理异常: %s", e)
 
     def _remove_route(self, dest_ip: str):
         """路由删除实现"""
         try:
-            subprocess.run(
-                ["ip", "-6", "route", "del", dest_ip],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-            print(f"🗑️ 路由删除成功: {dest_ip}")
-        except subprocess.CalledProcessError as e:
-            print(f"❌ 路由删除失败: {str(e)}")
+            self.ipr.route("del", family=socket.AF_INET6, dst=dest_ip, oif=self.ifindex)
+            logger.info("🗑️ 路由删除成功: %s", dest_ip)
+        except NetlinkError as e:
+            logger.error("❌ 路由删除失败: %s", e)
+
+        # 无论内核路由是否仍存在，调用方都会移除该路由记录
+        info = self.active_routes.get(dest_ip)
+        if info:
+            self._unindex_next_hop(info["next_hop"], dest_ip)
+            self._release_known(info["next_hop"], dest_ip)
+        self._release_known(dest_ip, dest_ip)
+
+    def _unindex_next_hop(self, next_hop: str, dest_ip: str):
+        """从下一跳索引中移除dest_ip"""
+        dests = self.next_hop_index.get(next_hop)
+        if dests is not None:
+            dests.discard(dest_ip)
+            if not dests:
+                del self.next_hop_index[next_hop]
+
+    def _known_key(self, ip: str):
+        return self.known_routes.Key.from_buffer_copy(socket.inet_pton(socket.AF_INET6, ip))
+
+    def _mark_known(self, ip: str):
+        """将地址加入内核已知表，时间戳与bpf_ktime_get_ns同为CLOCK_MONOTONIC"""
+        key = self._known_key(ip)
+        now = time.monotonic_ns()
+        self.known_routes[key] = self.known_routes.Leaf(now)
+        self.kernel_last_used[key] = self.kernel_last_used.Leaf(now)
+
+    def _kernel_idle_times(self) -> Dict[str, float]:
+        """读取内核记录的各地址空闲时间（秒）"""
+        now = time.monotonic_ns()
+        return {
+            socket.inet_ntop(socket.AF_INET6, bytes(k.addr)): (now - v.value) / 1e9
+            for k, v in self.kernel_last_used.items()
+        }
+
+    def _release_known(self, ip: str, dest_ip: str):
+        """dest_ip的路由不再使用ip时，若其他路由也未使用则从内核已知表移除"""
+        if ip != dest_ip and ip in self.active_routes:
+            return
+        if any(d != dest_ip for d in self.next_hop_index.get(ip, ())):
+            return
+        key = self._known_key(ip)
+        for table in (self.known_routes, self.kernel_last_used):
+            try:
+                del table[key]
+            except KeyError:
+                pass
 
     def _event_loop(self):
         """事件处理循环"""
         while True:
             try:
-                self.bpf.perf_buffer_poll(timeout=100)
+                self.bpf.ring_buffer_poll(timeout=100)
             except Exception as e:
-                print(f"⚠️ 事件循环异常: {str(e)}")
+                logger.warning("⚠️ 事件循环异常: %s", e)
                 time.sleep(1)
 
-    def handle_event(self, cpu, data, size):
+    def handle_event(self, ctx, data, size):
         """事件处理回调（新增下一跳地址处理）"""
         try:
             event = self.bpf["route_events"].event(data)
-            dest_ip = ipaddress.IPv6Address(bytes(event.daddr))
-            dest_str = str(dest_ip)
+            d = bytes(event.daddr)
 
-            src_ip = ipaddress.IPv6Address(bytes(event.saddr))
-            src_str = str(src_ip)
-        
-            # 过滤条件检查
-            if dest_ip == self.self_ipv6:
-                # print(f"🚫 过滤本机地址: {dest_str}")
-                return
-            if dest_ip == self.n_ipv6:
-                # print(f"🚫 过滤相邻地址: {dest_str}")
-                return
-    
-            if src_ip != self.self_ipv6:
-                print(f"🚫 过滤非本机流量 源地址: {src_ip} -> 目标: {dest_ip}")
+            # 过滤本机地址、相邻地址与非fd00::/8地址（非本机发出的流量已在内核中过滤）
+            if d == self._self_packed or d == self._n_packed or d[0] != 0xfd:
                 return
 
-            # print(f"🔍 捕获有效流量 -> 目标地址: {dest_str}")
-        
-            if dest_ip.is_private:
-                with self.lock:
-                    # 检查是否是已知路由的目标或下一跳
-                    matched = False
-                    for route_dest, info in self.active_routes.items():
-                        if dest_str == route_dest or dest_str == info["next_hop"]:
-                            info["last_used"] = time.time()
-                            matched = True
-                            # print(f"🔄 更新路由 {route_dest} 的last_used（下一跳: {info['next_hop']}）")
-                            break
-                    
-                # 未匹配到现有路由时触发路由管理
-                if not matched:
-                    self._route_manager(dest_str)
+            # 通过过滤后才生成字符串形式
+            dest_str = socket.inet_ntop(socket.AF_INET6, d)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔍 捕获有效流量 -> 目标地址: %s", dest_str)
+
+            # 读锁下只查找命中的路由，不做任何修改
+            with self.lock.gen_rlock():
+                # 检查是否是已知路由的目标或下一跳
+                if dest_str in self.active_routes:
+                    touched = [dest_str]
+                else:
+                    # 外层目的地址为下一跳，无法区分具体目标，刷新经由它的所有路由
+                    touched = list(self.next_hop_index.get(dest_str, ()))
+            matched = bool(touched)
+
+            # 刷新last_used属于修改，在写锁下进行；期间路由可能已被清理
+            if matched:
+                now = time.time()
+                with self.lock.gen_wlock():
+                    for route_dest in touched:
+                        info = self.active_routes.get(route_dest)
+                        if info is not None:
+                            info["last_used"] = now
+                            if logger.isEnabledFor(logging.DEBUG):
+                                logger.debug("🔄 更新路由 %s 的last_used（目的地址: %s）", route_dest, dest_str)
+
+            # 未匹配到现有路由时交由线程池触发路由管理
+            if not matched:
+                with self.resolving_lock:
+                    # 该目标已在解析中
+                    if dest_str in self.resolving:
+                        return
+                    self.resolving.add(dest_str)
+                self.resolver.submit(self._route_manager, dest_str)
         except Exception as e:
-            print(f"⚠️ 事件处理异常: {str(e)}")
+            logger.warning("⚠️ 事件处理异常: %s", e)
 
 # --------------------------
 # 主程序入口
@@ -539,21 +729,22 @@ if __name__ == "__main__":
         
     # 处理命令行参数
     if len(sys.argv) > 1 and sys.argv[1] == "--no-visual":
-        print("ℹ️ 已禁用可视化系统集成")
+        logger.info("ℹ️ 已禁用可视化系统集成")
         CONFIG["visual_api"] = ""
         
     try:
         router = SRv6DynamicRouter()
-        print(f"ℹ️ 路由器已启动，可视化系统API: {CONFIG.get('visual_api', '未配置')}")
+        logger.info("ℹ️ 路由器已启动，可视化系统API: %s", CONFIG.get('visual_api', '未配置'))
         while True:
             time.sleep(3600)
     except KeyboardInterrupt:
-        print("\n🛑 安全停止中...")
+        logger.info("🛑 安全停止中...")
         if router:
-            with router.lock:
+            with router.lock.gen_wlock():
                 for ip in list(router.active_routes.keys()):
                     router._remove_route(ip)
+            router.close()
         sys.exit(0)
     except Exception as e:
-        print(f"💥 致命错误: {str(e)}")
+        logger.error("💥 致命错误: %s", e)
         sys.exit(1)
\ No newline at end of file
@@ -34,7 +34,7 @@ AllowTcpForwarding yes
 
 cp id_ed25519.pub /root/.ssh/authorized_keys
 
-python3 -m pip install httpx -i https://pypi.tuna.tsinghua.edu.cn/simple/
+python3 -m pip install httpx pyroute2 readerwriterlock -i https://pypi.tuna.tsinghua.edu.cn/simple/
 
 apk add bcc-tools py3-bcc ffmpeg mpv
 
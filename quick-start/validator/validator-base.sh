@@ -50,5 +50,5 @@ PubkeyAuthentication yes
 
 cp id_ed25519.pub /root/.ssh/authorized_keys
 
-# Add the python3 dependencies: request and ping3
-python3 -m pip install ping3 requests -i https://pypi.tuna.tsinghua.edu.cn/simple/
+# Add the python3 dependencies: request, ping3 and pyroute2
+python3 -m pip install ping3 requests pyroute2 -i https://pypi.tuna.tsinghua.edu.cn/simple/
@@ -160,7 +160,12 @@ def main():
     from celestial.srv6_route_server import SRv6RouteHandler
     
     # 使用parent_conn初始化SRv6路由服务器
-    srv6_route_server = SRv6RouteServer(port=8080, animation_conn=parent_conn)
+    srv6_route_server = SRv6RouteServer(
+        port=8080,
+        animation_conn=parent_conn,
+        shell_sats=[shell.total_sats for shell in config.shells],
+        gst_num=len(config.ground_stations),
+    )
     srv6_route_server.start()
     
     # 确认连接对象是否一致
@@ -187,11 +192,12 @@ def main():
         }
     )
     
+    # 主机操作线程池，注册、初始化与每个时间步的更新复用同一组线程
+    host_pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(8, len(hosts)))
+    
     # 注册主机
     logging.info("Registering hosts...")
-    with concurrent.futures.ThreadPoolExecutor() as e:
-        for h in hosts:
-            e.submit(h.register)
+    concurrent.futures.wait([host_pool.submit(h.register) for h in hosts])
     logging.info("Host registration complete!")
     
     # 初始化主机
@@ -217,9 +223,7 @@ def main():
     # 初始化主机
     logging.info("Initializing hosts...")
     init_request = celestial.proto_util.make_init_request(hosts, machines)
-    with concurrent.futures.ThreadPoolExecutor() as e:
-        for h in hosts:
-            e.submit(h.init, init_request)
+    concurrent.futures.wait([host_pool.submit(h.init, init_request) for h in hosts])
     
     logging.info("Host initialization complete!")
     
@@ -236,6 +240,9 @@ def main():
         logging.debug(f"Getting diff data took {time.perf_counter() - t1} seconds")
         return s
     
+    # 差异数据预取线程，与主机更新并行计算下一个时间步的数据
+    diff_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    
     # 开始仿真
     timestep: celestial.types.timestamp_s = 0 + config.offset
     updates = get_diff(timestep)
@@ -251,28 +258,41 @@ def main():
             logging.info(f"Updating timestep {timestep}")
             
             # 更新主机
-            with concurrent.futures.ThreadPoolExecutor() as e:
-                for i in range(len(hosts)):
-                    e.submit(hosts[i].update, (u for u in updates))
+            host_futures = [
+                host_pool.submit(hosts[i].update, (u for u in updates)) for i in range(len(hosts))
+            ]
+            
+            next_timestep = timestep + config.resolution
+            
+            # 主机更新期间提前获取下一个时间步的更新数据
+            diff_future = None
+            if next_timestep <= config.duration + config.offset:
+                logging.debug(f"Getting update data for timestep {next_timestep}")
+                diff_future = diff_pool.submit(get_diff, next_timestep)
+            
+            # 等待所有主机完成，与此前退出with块时的行为一致
+            concurrent.futures.wait(host_futures)
             
             # 更新动画
             animation_constellation.step(timestep)
             
-            timestep += config.resolution
+            timestep = next_timestep
             
-            if timestep > config.duration + config.offset:
+            if diff_future is None:
                 break
             
-            logging.debug(f"Getting update data for timestep {timestep}")
-            
-            # 提前获取下一个时间步的更新数据
-            updates = get_diff(timestep)
+            updates = diff_future.result()
             
-            # 等待直到达到仿真时间
-            wait_time = timestep - config.offset - (time.perf_counter() - start_time)
+            # 等待直到达到仿真时间：先一次性睡眠到截止前1ms，再短暂自旋校正
+            deadline = start_time + (timestep - config.offset)
+            wait_time = deadline - time.perf_counter()
             logging.debug(f"Waiting {wait_time} seconds")
-            while time.perf_counter() - start_time < timestep - config.offset:
-                time.sleep(0.001)
+            if wait_time > 0.001:
+                time.sleep(wait_time - 0.001)
+            # 睡眠后距截止不足约1ms（加上sleep的唤醒延迟则通常已过截止），自旋时间有界；
+            # 本时间步已超时（wait_time <= 0）时既不睡眠也不自旋
+            while time.perf_counter() < deadline:
+                pass
     
     except KeyboardInterrupt:
         logging.info("Simulation interrupted by user")
@@ -280,9 +300,9 @@ def main():
     finally:
         # 停止主机
         logging.info("Stopping simulation...")
-        with concurrent.futures.ThreadPoolExecutor() as e:
-            for i in range(len(hosts)):
-                e.submit(hosts[i].stop)
+        concurrent.futures.wait([host_pool.submit(hosts[i].stop) for i in range(len(hosts))])
+        host_pool.shutdown()
+        diff_pool.shutdown(cancel_futures=True)
         
         # 停止SRv6路由服务器
         logging.info("Stopping SRv6 route server...")